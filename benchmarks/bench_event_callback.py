@@ -0,0 +1,84 @@
+"""
+Micro-benchmark for SelveGateway._event_callback.
+
+Feeds synthetic gateway events through the event translation and reports the
+number of events handled per second, once with and once without listeners for
+selve_event on the bus.
+
+Usage: python benchmarks/bench_event_callback.py [--events N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.const import CONF_PORT  # noqa: E402
+from homeassistant.core import HomeAssistant, callback  # noqa: E402
+from selve import CommeoDeviceEventResponse, DutyCycleResponse, LogEventResponse, SensorEventResponse  # noqa: E402
+
+from custom_components.selve import SELVE_EVENT, SelveGateway  # noqa: E402
+
+
+def make_events(count: int) -> list:
+    """Return a mixed stream of gateway events as they arrive from the controller."""
+    events = []
+    for i in range(count):
+        kind = i % 10
+        if kind < 7:
+            events.append(CommeoDeviceEventResponse("selve.GW.event.device", [
+                ("string", "Shutter " + str(i % 64)), ("int", str(i % 64)), ("int", "2"),
+                ("int", str((i * 655) % 65535)), ("int", "65535"), ("int", "0"), ("int", "3"), ("int", "1"),
+            ]))
+        elif kind == 7:
+            events.append(SensorEventResponse("selve.GW.event.sensor", [
+                ("int", str(i % 8)), ("int", "1"), ("int", "1"), ("int", "1"), ("int", "3"), ("int", "1"),
+                ("int", "21"), ("int", "3"), ("int", "400"), ("int", "1000"), ("int", "380"), ("int", "390"),
+            ]))
+        elif kind == 8:
+            events.append(DutyCycleResponse("selve.GW.event.dutyCycle", [("int", "0"), ("int", str(i % 100))]))
+        else:
+            events.append(LogEventResponse("selve.GW.event.log", [
+                ("string", "C1"), ("string", "0"), ("string", "1"), ("string", "Info"), ("int", "0"),
+            ]))
+    return events
+
+
+async def run(events: list, listeners: bool) -> float:
+    """Push all events through the callback and return the events per second."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = SimpleNamespace(entry_id="benchmark", data={CONF_PORT: "/dev/null"}, options={})
+        gateway = SelveGateway(hass, entry)
+        gateway.gatewayId = "benchmark"
+        if listeners:
+            hass.bus.async_listen(SELVE_EVENT, callback(lambda event: None))
+
+        start = time.perf_counter()
+        for response in events:
+            gateway._event_callback(response)
+        elapsed = time.perf_counter() - start
+        await hass.async_stop(force=True)
+    return len(events) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=200000)
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+    for listeners in (True, False):
+        rate = asyncio.run(run(events, listeners))
+        print(f"listeners={listeners!s:5}  {rate:12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
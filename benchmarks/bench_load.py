@@ -0,0 +1,151 @@
+"""
+Load benchmark for a gateway with many devices.
+
+Creates the cover and binary sensor entities of 10, 100 and 1000 simulated
+Commeo devices and the weather sensor entities of one sensor per ten devices
+in a Home Assistant instance, and replays Commeo device, sensor and duty
+cycle event streams through SelveGateway._event_callback and the device
+listeners. Reports the events handled per second, the entity state
+writes per event and the memory per entity. Use the results as the baseline
+when changing the event or state write path.
+
+Usage: python benchmarks/bench_load.py [--devices 10 100 1000] [--events N] [--rate EVENTS_PER_S]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.const import CONF_PORT  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+from selve import SelveTypes  # noqa: E402
+
+from custom_components.selve import SelveGateway  # noqa: E402
+from custom_components.selve.binary_sensor import BINARY_SENSORS_TYPES, SelveSensor  # noqa: E402
+from custom_components.selve.const import CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW  # noqa: E402
+from custom_components.selve.cover import SelveCover  # noqa: E402
+from custom_components.selve.sensor import WEATHER_SENSOR_TYPES, SelveWeatherSensor  # noqa: E402
+
+from fake_selve import FakeSelve, commeo_events, duty_events, mixed_events, sensor_events  # noqa: E402
+
+STREAMS = ("commeo", "sensor", "duty", "mixed")
+
+
+def make_stream(stream: str, devices: int, sensors: int, count: int) -> list:
+    """Return `count` events of the given stream."""
+    if stream == "commeo":
+        return commeo_events(devices, count)
+    if stream == "sensor":
+        return sensor_events(sensors, count)
+    if stream == "duty":
+        return duty_events(count)
+    return mixed_events(devices, sensors, count)
+
+
+async def add_entity(hass: HomeAssistant, entity, entity_id: str) -> None:
+    """Add an entity to the state machine the way its platform would."""
+    entity.hass = hass
+    entity.entity_id = entity_id
+    # There is no entity platform, which is fine for a benchmark
+    entity._no_platform_reported = True
+    await entity.async_added_to_hass()
+    entity.async_write_ha_state()
+
+
+async def run(devices: int, stream: str, count: int, rate: float, write_window: int) -> dict:
+    """Replay one stream against a gateway with `devices` covers and return the results."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        entry = SimpleNamespace(
+            entry_id="benchmark",
+            data={CONF_PORT: "/dev/null"},
+            options={CONF_WRITE_WINDOW: write_window},
+        )
+        gateway = SelveGateway(hass, entry)
+        gateway.gatewayId = "benchmark"
+        controller = gateway.controller = FakeSelve(device_updated=gateway._device_updated)
+        controller.register_event_callback(gateway._event_callback)
+        sensors = max(1, devices // 10)
+        controller.add_devices(devices, sensors)
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        entities = []
+        for id, device in controller.devices[SelveTypes.DEVICE.value].items():
+            cover = SelveCover(device, SelveTypes.DEVICE, gateway, entry)
+            await add_entity(hass, cover, f"cover.shutter_{id}")
+            entities.append(cover)
+            for description in BINARY_SENSORS_TYPES:
+                sensor = SelveSensor(device, SelveTypes.DEVICE, gateway, description)
+                await add_entity(hass, sensor, f"binary_sensor.shutter_{id}_{description.key.lower()}")
+                entities.append(sensor)
+        for id, device in controller.devices[SelveTypes.SENSOR.value].items():
+            for description in WEATHER_SENSOR_TYPES:
+                sensor = SelveWeatherSensor(device, gateway, description)
+                await add_entity(hass, sensor, f"sensor.sensor_{id}_{description.key}")
+                entities.append(sensor)
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+
+        events = make_stream(stream, devices, sensors, count)
+        writes_before = gateway.state_write_count
+        elapsed = await controller.replay(events, rate)
+        # Let the last coalesced writes happen
+        await asyncio.sleep(write_window / 1000 * 2)
+
+        result = {
+            "devices": devices,
+            "entities": len(entities),
+            "stream": stream,
+            "events": count,
+            "events_per_s": round(count / elapsed),
+            "writes_per_event": round((gateway.state_write_count - writes_before) / count, 3),
+            "skipped_writes": gateway.skipped_write_count,
+            "coalesced_updates": gateway.coalesced_update_count,
+            "bytes_per_entity": round(memory / len(entities)),
+        }
+        await hass.async_stop(force=True)
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--streams", nargs="+", choices=STREAMS, default=list(STREAMS))
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=0, help="events per second, 0 for as fast as possible")
+    parser.add_argument("--write-window", type=int, default=DEFAULT_WRITE_WINDOW, help="state write window in ms")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    results = []
+    for devices in args.devices:
+        for stream in args.streams:
+            result = await run(devices, stream, args.events, args.rate, args.write_window)
+            results.append(result)
+            if not args.json:
+                print(
+                    f"devices={devices:<5} entities={result['entities']:<6} stream={stream:7}"
+                    f"{result['events_per_s']:10,} events/s  {result['writes_per_event']:6.3f} writes/event"
+                    f"  {result['bytes_per_entity']:7,} bytes/entity"
+                )
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
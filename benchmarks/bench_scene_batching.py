@@ -0,0 +1,100 @@
+"""
+Benchmark for the batching of scene commands in CommandScheduler.
+
+Moves a number of Commeo covers at the same time, the way a scene or a cover
+group does, and reports the RF transmissions, the value reads sent with them
+and the time per scene, once with and once without mask batching.
+
+Usage: python benchmarks/bench_scene_batching.py [--covers N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from selve import DriveCommandCommeo, Util  # noqa: E402
+
+from custom_components.selve.controller import SelveController  # noqa: E402
+from custom_components.selve.scheduler import CommandScheduler  # noqa: E402
+
+
+class FakeController:
+    """Controller that only counts transmissions and value reads.
+
+    The mask command is the integration's own, so the requests it sends
+    besides the transmission are counted too.
+    """
+
+    moveDevicesMask = SelveController.moveDevicesMask
+    _move_devices_mask = SelveController._move_devices_mask
+
+    def __init__(self) -> None:
+        self.transmissions = 0
+        self.reads = 0
+        self.reversedStopPosition = 0
+
+    async def executeCommandSyncWithResponse(self, command):
+        self.transmissions += 1
+        return SimpleNamespace(executed=True)
+
+    async def updateCommeoDeviceValuesAsync(self, id):
+        self.reads += 1
+
+    def addOrUpdateDevice(self, device, type):
+        pass
+
+    async def moveDevicePos(self, device, pos):
+        # The library reads the device values after every single command
+        self.transmissions += 1
+        await self.updateCommeoDeviceValuesAsync(device.id)
+
+
+async def run_scene(covers: int, positions: int, batching: bool) -> tuple[int, int, float]:
+    """Move all covers to one of `positions` targets. Returns the transmissions, reads and seconds."""
+    loop = asyncio.get_running_loop()
+
+    async def get_duty():
+        return True
+
+    scheduler = CommandScheduler(SimpleNamespace(loop=loop), get_duty)
+    scheduler.start(SimpleNamespace(async_create_background_task=lambda hass, coro, name: loop.create_task(coro)))
+    controller = FakeController()
+
+    def move(id: int):
+        device = SimpleNamespace(id=id, state=None, targetValue=None)
+        pos = (id % positions) * 10
+        batch = None
+        if batching:
+            batch = (controller.moveDevicesMask, DriveCommandCommeo.DRIVEPOS, Util.percentageToValue(pos))
+        return scheduler.async_send(controller.moveDevicePos, device, pos, key=("device", id), batch=batch)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(move(id) for id in range(1, covers + 1)))
+    elapsed = time.perf_counter() - start
+    await scheduler.async_stop()
+    return controller.transmissions, controller.reads, elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--covers", type=int, default=15)
+    args = parser.parse_args()
+
+    for positions in (1, 3, args.covers):
+        for batching in (False, True):
+            transmissions, reads, elapsed = await run_scene(args.covers, positions, batching)
+            print(
+                f"covers={args.covers} targets={positions:<3} batching={batching!s:5}  "
+                f"{transmissions:3} transmissions/scene  {reads:3} reads/scene  {elapsed:6.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
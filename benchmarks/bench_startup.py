@@ -0,0 +1,121 @@
+"""
+End-to-end benchmark of startup and reconnection against the gateway emulator.
+
+Starts a Home Assistant instance with the integration, adds the gateway on the
+emulator's PTY through the config flow and reports the time to set up the
+entry and its entities, first with discovery and then from the device cache.
+It then stops the emulator from answering and reports how long it takes until
+the entities become unavailable, and until they are available again once the
+emulator answers again.
+
+Usage: python benchmarks/bench_startup.py [--devices N] [--latency S] [--loss P]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant import bootstrap, loader  # noqa: E402
+from homeassistant.config_entries import ConfigEntries  # noqa: E402
+from homeassistant.const import CONF_PORT  # noqa: E402
+
+from custom_components.selve.const import DOMAIN  # noqa: E402
+
+from gateway_emulator import GatewayEmulator  # noqa: E402
+
+
+async def wait_for(condition, timeout: float = 60.0) -> float:
+    """Wait until `condition()` is true and return the seconds it took."""
+    start = time.monotonic()
+    while not condition():
+        if time.monotonic() - start > timeout:
+            raise TimeoutError
+        await asyncio.sleep(0.01)
+    return time.monotonic() - start
+
+
+async def run(args) -> None:
+    emulator = GatewayEmulator(
+        devices=args.devices, iveo=args.iveo, groups=args.groups, sensors=args.sensors,
+        latency=args.latency, loss=args.loss, seed=1,
+    )
+    port = emulator.start()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        # Load the integration from this checkout as a custom integration
+        os.symlink(
+            os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "custom_components")),
+            os.path.join(config_dir, "custom_components"),
+        )
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.config_entries = ConfigEntries(hass, {})
+        await bootstrap.async_load_base_functionality(hass)
+        await hass.async_start()
+
+        start = time.monotonic()
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": "user"}, data={"autodiscovery": False, CONF_PORT: port}
+        )
+        if result["type"] != "create_entry":
+            print(f"Config flow failed: {result}")
+            return
+        loaded = time.monotonic() - start
+        await hass.async_block_till_done()
+        print(
+            f"setup with discovery  {loaded:6.2f} s, values read after {time.monotonic() - start:6.2f} s  "
+            f"{len(hass.states.async_all())} entities"
+        )
+
+        entry = hass.config_entries.async_entries(DOMAIN)[0]
+        requests = emulator.request_count
+        start = time.monotonic()
+        await hass.config_entries.async_reload(entry.entry_id)
+        loaded = time.monotonic() - start
+        await hass.async_block_till_done()
+        print(
+            f"setup from cache      {loaded:6.2f} s, values read after {time.monotonic() - start:6.2f} s  "
+            f"{emulator.request_count - requests} requests"
+        )
+
+        gateway = hass.data[DOMAIN][port]
+        emulator.paused = True
+        # As after a request that timed out
+        gateway.health.request_check()
+        print(f"unavailable after     {await wait_for(lambda: not gateway.available):6.2f} s")
+        emulator.paused = False
+        print(f"available again after {await wait_for(lambda: gateway.available):6.2f} s")
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop()
+
+    emulator.stop()
+    print(f"{emulator.request_count} requests, {emulator.dropped_count} not answered, {emulator.event_count} events")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=16)
+    parser.add_argument("--iveo", type=int, default=2)
+    parser.add_argument("--groups", type=int, default=2)
+    parser.add_argument("--sensors", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds until the emulator answers")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability that a request is not answered")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Simulated gateway for the benchmarks.
+
+FakeSelve is a SelveController without a serial port. It holds synthetic
+devices and replays streams of gateway events through the library's own event
+processing, so device updates and event callbacks reach the integration the
+same way they do with a real gateway.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from selve import (  # noqa: E402
+    CommeoDeviceEventResponse,
+    CommunicationType,
+    DeviceType,
+    DutyCycleResponse,
+    MovementState,
+    SelveDevice,
+    SelveSensor,
+    SelveTypes,
+    SensorEventResponse,
+    Util,
+)
+
+from custom_components.selve.controller import SelveController  # noqa: E402
+
+_LOGGER = logging.getLogger(__name__)
+
+# Position steps of a cover movement in a Commeo event stream
+MOVEMENT_STEPS = 10
+
+
+class FakeSelve(SelveController):
+    """Controller with synthetic devices that replays gateway events instead of reading a port."""
+
+    def __init__(self, device_updated=None) -> None:
+        super().__init__(port=None, discover=False, logger=_LOGGER, device_updated=device_updated)
+        self.gateway_id = "fake"
+        self.replayed_count = 0
+
+    def add_devices(self, devices: int, sensors: int = 0) -> None:
+        """Add Commeo covers with ids 0..devices-1 and sensors with ids 0..sensors-1.
+
+        A real gateway addresses at most 64 devices. Larger ids are accepted to
+        show how the integration scales, their masks wrap around.
+        """
+        for id in range(devices):
+            device = SelveDevice(id % 64, SelveTypes.DEVICE, DeviceType.SHUTTER)
+            device.id = id
+            device.name = f"Shutter {id}"
+            device.communicationType = CommunicationType.COMMEO
+            device.state = MovementState.STOPPED_OFF
+            self.devices[SelveTypes.DEVICE.value][id] = device
+        for id in range(sensors):
+            sensor = SelveSensor(id % 64)
+            sensor.id = id
+            sensor.name = f"Sensor {id}"
+            self.devices[SelveTypes.SENSOR.value][id] = sensor
+
+    async def replay(self, events: list, rate: float = 0, chunk: int = 100) -> float:
+        """Process `events` as if the gateway had sent them. Returns the seconds it took.
+
+        With `rate`, events are sent at that many events per second, otherwise
+        as fast as possible. The event loop runs between chunks of events, so
+        timers such as the coalesced state writes fire during the replay.
+        """
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for index in range(0, len(events), chunk):
+            if rate:
+                delay = start + index / rate - loop.time()
+                await asyncio.sleep(max(0.0, delay))
+            else:
+                await asyncio.sleep(0)
+            for response in events[index:index + chunk]:
+                await self.processEventResponse(response)
+            self.replayed_count += min(chunk, len(events) - index)
+        return loop.time() - start
+
+
+def commeo_event(id: int, state: MovementState, position: int, flags: int = 0) -> CommeoDeviceEventResponse:
+    """Return a device event of a Commeo cover at `position` percent."""
+    value = str(Util.percentageToValue(position))
+    return CommeoDeviceEventResponse("selve.GW.event.device", [
+        ("string", f"Shutter {id}"), ("int", str(id)), ("int", str(state.value)),
+        ("int", value), ("int", value), ("int", str(flags)), ("int", "3"), ("int", str(DeviceType.SHUTTER.value)),
+    ])
+
+
+def commeo_events(devices: int, count: int) -> list:
+    """Return device events of covers moving down and up in turn.
+
+    Each movement is a start, `MOVEMENT_STEPS` intermediate positions and a
+    stop. Every 50th event toggles the wind alarm of the device.
+    """
+    events = []
+    steps = MOVEMENT_STEPS + 2
+    for index in range(count):
+        id = index % devices
+        cycle, step = divmod(index // devices, steps)
+        closing = cycle % 2 == 0
+        if step == steps - 1:
+            state = MovementState.STOPPED_OFF
+            position = 100 if closing else 0
+        else:
+            state = MovementState.DOWN_ON if closing else MovementState.UP_ON
+            position = step * 100 // MOVEMENT_STEPS
+            if not closing:
+                position = 100 - position
+        flags = 1 << 7 if (index // 50) % 2 else 0
+        events.append(commeo_event(id, state, position, flags))
+    return events
+
+
+def sensor_events(sensors: int, count: int) -> list:
+    """Return sensor events with slowly changing analog values."""
+    events = []
+    for index in range(count):
+        id = index % sensors
+        tick = index // sensors
+        events.append(SensorEventResponse("selve.GW.event.sensor", [
+            ("int", str(id)), ("int", "1"), ("int", "1"), ("int", "1"), ("int", "1"), ("int", "1"),
+            ("int", str(15 + tick % 10)), ("int", str(tick % 20)), ("int", str(tick % 1000)),
+            ("int", str(1000 + tick % 100)), ("int", str(tick % 800)), ("int", str(tick % 600)),
+        ]))
+    return events
+
+
+def duty_events(count: int) -> list:
+    """Return duty cycle events with rising and falling RF traffic, never blocked."""
+    return [
+        DutyCycleResponse("selve.GW.event.dutyCycle", [("int", "0"), ("int", str(abs(index % 100 - 50)))])
+        for index in range(count)
+    ]
+
+
+def mixed_events(devices: int, sensors: int, count: int) -> list:
+    """Return a stream of 80 % device, 15 % sensor and 5 % duty cycle events."""
+    commeo = iter(commeo_events(devices, count))
+    sensor = iter(sensor_events(sensors, count))
+    duty = iter(duty_events(count))
+    events = []
+    for index in range(count):
+        kind = index % 20
+        if kind < 16:
+            events.append(next(commeo))
+        elif kind < 19:
+            events.append(next(sensor))
+        else:
+            events.append(next(duty))
+    return events
+
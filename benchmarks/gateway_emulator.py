@@ -0,0 +1,496 @@
+"""
+Virtual Selve USB-RF gateway on a pseudo-terminal.
+
+The emulator opens a PTY and answers the gateway's XML protocol on it, so the
+library and the integration can connect to the PTY's path like to the real
+serial port. It knows Commeo devices, Iveo devices, groups, sensors, senders
+and senSims, answers their discovery, info and value requests, moves covers in
+response to drive commands and sends device, sensor and duty cycle events.
+Answers can be delayed and dropped, and events lost, to emulate a slow or lossy
+gateway.
+
+Usage: python benchmarks/gateway_emulator.py [--devices N] [--latency S] [--loss P] [--event-loss P]
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import itertools
+import os
+import pty
+import random
+import select
+import threading
+import time
+import tty
+import xml.etree.ElementTree as ET
+
+from selve import DriveCommandCommeo, MovementState, ServiceState, Util
+
+SERIAL = "EMULATED0001"
+# Firmware version parts and spec version as reported by service.getVersion
+VERSION = (1, 2, 3, 4)
+SPEC = (2, 0)
+
+# Position of a cover in percent, 0 is open and 100 is closed as in the library
+OPEN = 0
+CLOSED = 100
+
+
+def _xml_params(params) -> str:
+    return "".join(f"<{kind}>{value}</{kind}>" for kind, value in params)
+
+
+def _response(method: str, params) -> str:
+    # The library expects the method name as first string, then strings, ints and base64 values
+    return f'<?xml version="1.0" encoding="UTF-8"?><methodResponse><array><string>{method}</string>{_xml_params(params)}</array></methodResponse>'
+
+
+def _event(method: str, params) -> str:
+    return f'<?xml version="1.0" encoding="UTF-8"?><methodCall><methodName>{method}</methodName><array>{_xml_params(params)}</array></methodCall>'
+
+
+def _fault(message: str, code: int) -> str:
+    return f'<?xml version="1.0" encoding="UTF-8"?><methodResponse><fault><array><string>{message}</string><int>{code}</int></array></fault></methodResponse>'
+
+
+def _ids(devices) -> tuple:
+    return ("base64", Util.multimask(list(devices)))
+
+
+class EmulatedCover:
+    """A Commeo or Iveo cover of the emulated gateway."""
+
+    def __init__(self, id: int, name: str, device_type: int = 1, position: int = OPEN) -> None:
+        self.id = id
+        self.name = name
+        self.device_type = device_type
+        self.position = position
+        self.target = position
+        self.state = MovementState.STOPPED_OFF
+        self.flags = 0
+        self.pos1 = 50
+        self.pos2 = 75
+
+
+class GatewayEmulator:
+    """Selve gateway answering on a pseudo-terminal.
+
+    The emulator runs in its own thread, like a real gateway it answers one
+    request after the other. `latency` delays every answer by that many
+    seconds, `loss` is the probability that a request is not answered at all.
+    Covers need `travel_time` seconds for a full travel and report their
+    position every `event_interval` seconds while moving.
+    """
+
+    def __init__(
+        self,
+        devices: int = 8,
+        iveo: int = 0,
+        groups: int = 0,
+        sensors: int = 0,
+        senders: int = 0,
+        sensims: int = 0,
+        latency: float = 0.0,
+        loss: float = 0.0,
+        event_loss: float = 0.0,
+        travel_time: float = 2.0,
+        event_interval: float = 0.5,
+        seed: int | None = None,
+    ) -> None:
+        self.latency = latency
+        self.loss = loss
+        # Probability that an event is not sent, as if lost on the RF or USB link
+        self.event_loss = event_loss
+        self.travel_time = travel_time
+        self.event_interval = event_interval
+        # While paused, requests are read but never answered
+        self.paused = False
+
+        self.devices = {id: EmulatedCover(id, f"Shutter {id}") for id in range(devices)}
+        self.iveo = {id: EmulatedCover(id, f"Iveo {id}") for id in range(iveo)}
+        self.groups = {
+            id: (f"Group {id}", [device for device in self.devices if device % max(groups, 1) == id])
+            for id in range(groups)
+        }
+        self.sensors = {id: f"Sensor {id}" for id in range(sensors)}
+        self.senders = {id: f"Sender {id}" for id in range(senders)}
+        self.sensims = {id: f"SenSim {id}" for id in range(sensims)}
+        # Simulated values per senSim, in the order of senSim.setValues
+        self.sensim_values = {id: [1, 1, 1, 1, 20, 0, 0, 1000, 0, 0] for id in self.sensims}
+        self.events_enabled = True
+        self.traffic = 0
+        self.temperature = 24
+        # Command, executed ids and failed ids of the last command
+        self._last_result = (DriveCommandCommeo.STOP, [], [])
+
+        self.request_count = 0
+        self.dropped_count = 0
+        self.event_count = 0
+        self.lost_event_count = 0
+        self.requests = {}
+
+        self._random = random.Random(seed)
+        self._master = None
+        self._slave = None
+        self.port = None
+        self._wake_read, self._wake_write = os.pipe()
+        self._lock = threading.Lock()
+        self._timers = []
+        self._sequence = itertools.count()
+        self._next_answer = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> str:
+        """Open the PTY and start answering. Returns the path to connect to."""
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="selve-gateway-emulator", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self) -> None:
+        """Stop answering and close the PTY."""
+        self._stop.set()
+        os.write(self._wake_write, b"x")
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    # Unsolicited events, may be called from any thread
+
+    def send_device_event(self, id: int) -> None:
+        """Send the current values of a Commeo device."""
+        device = self.devices[id]
+        self._send_event("selve.GW.event.device", [
+            ("string", device.name), ("int", id), ("int", device.state.value),
+            ("int", Util.percentageToValue(device.position)), ("int", Util.percentageToValue(device.target)),
+            ("int", device.flags), ("int", 3), ("int", device.device_type),
+        ])
+
+    def send_sensor_event(self, id: int, temperature: int = 20, wind: int = 0, sun: int = 0) -> None:
+        """Send the values of a sensor."""
+        self._send_event("selve.GW.event.sensor", [
+            ("int", id), ("int", 1), ("int", 1), ("int", 1), ("int", 1), ("int", 1),
+            ("int", temperature), ("int", wind), ("int", sun), ("int", 1000), ("int", sun), ("int", sun),
+        ])
+
+    def send_sender_event(self, id: int, event: int) -> None:
+        """Send a button press of a sender, `event` is a senderEvents value."""
+        self._send_event("selve.GW.event.sender", [
+            ("string", self.senders[id]), ("int", id), ("int", event),
+        ])
+
+    def send_duty_event(self, blocked: bool = False, traffic: int | None = None) -> None:
+        """Send the RF duty cycle."""
+        if traffic is not None:
+            self.traffic = traffic
+        self._send_event("selve.GW.event.dutyCycle", [("int", int(blocked)), ("int", self.traffic)])
+
+    def _send_event(self, method: str, params) -> None:
+        if self.events_enabled:
+            if self.event_loss and self._random.random() < self.event_loss:
+                self.lost_event_count += 1
+                return
+            self.event_count += 1
+            self._schedule(0, lambda: self._write(_event(method, params)))
+
+    # Thread of the emulator
+
+    def _schedule(self, delay: float, action) -> None:
+        with self._lock:
+            heapq.heappush(self._timers, (time.monotonic() + delay, next(self._sequence), action))
+        os.write(self._wake_write, b"x")
+
+    def _run(self) -> None:
+        buffer = ""
+        while not self._stop.is_set():
+            with self._lock:
+                timeout = max(0.0, self._timers[0][0] - time.monotonic()) if self._timers else None
+            readable, _, _ = select.select([self._master, self._wake_read], [], [], timeout)
+            if self._wake_read in readable:
+                os.read(self._wake_read, 1024)
+            if self._master in readable:
+                try:
+                    buffer += os.read(self._master, 65536).decode(errors="ignore")
+                except OSError:
+                    return
+                while (end := buffer.find("</methodCall>")) != -1:
+                    frame, buffer = buffer[:end + len("</methodCall>")], buffer[end + len("</methodCall>"):]
+                    self._handle_frame(frame)
+            while True:
+                with self._lock:
+                    if not self._timers or self._timers[0][0] > time.monotonic():
+                        break
+                    _, _, action = heapq.heappop(self._timers)
+                action()
+
+    def _write(self, message: str) -> None:
+        # A frame ends with an empty line
+        os.write(self._master, (message + "\n\n").encode())
+
+    def _handle_frame(self, frame: str) -> None:
+        try:
+            root = ET.fromstring(frame[frame.find("<methodCall>"):])
+        except ET.ParseError:
+            return
+        method = root.findtext("methodName", "")
+        params = [(child.tag, child.text or "") for child in root.iterfind("array/*")]
+        self.request_count += 1
+        self.requests[method] = self.requests.get(method, 0) + 1
+        if self.paused or (self.loss and self._random.random() < self.loss):
+            self.dropped_count += 1
+            return
+
+        answer = self._answer(method, params)
+        # Answers leave the gateway in order
+        now = time.monotonic()
+        self._next_answer = max(now + self.latency, self._next_answer)
+        with self._lock:
+            heapq.heappush(self._timers, (self._next_answer, next(self._sequence), lambda: self._write(answer)))
+
+    def _answer(self, method: str, params) -> str:
+        command = method.removeprefix("selve.GW.")
+        handler = getattr(self, "_" + command.replace(".", "_"), None)
+        if handler is None:
+            return _fault(f"Unknown method {method}", 1)
+        ints = [int(value) for kind, value in params if kind == "int"]
+        masks = [value for kind, value in params if kind == "base64"]
+        strings = [value for kind, value in params if kind == "string"]
+        try:
+            return _response(method, handler(ints, masks, strings))
+        except (KeyError, IndexError):
+            return _fault(f"Invalid parameters for {method}", 2)
+
+    # Service
+
+    def _service_ping(self, ints, masks, strings):
+        return []
+
+    def _service_getState(self, ints, masks, strings):
+        return [("int", ServiceState.READY.value)]
+
+    def _service_getLED(self, ints, masks, strings):
+        return [("int", 1)]
+
+    def _service_getVersion(self, ints, masks, strings):
+        return [("string", SERIAL), ("int", VERSION[0]), ("int", VERSION[1]), ("int", VERSION[2]),
+                ("int", SPEC[0]), ("int", SPEC[1]), ("int", VERSION[3])]
+
+    # Parameters
+
+    def _param_setEvent(self, ints, masks, strings):
+        self.events_enabled = any(ints)
+        return [("int", 1)]
+
+    def _param_getEvent(self, ints, masks, strings):
+        return [("int", int(self.events_enabled))] * 5
+
+    def _param_getDuty(self, ints, masks, strings):
+        return [("int", 0), ("int", self.traffic)]
+
+    def _param_getTemperature(self, ints, masks, strings):
+        return [("int", self.temperature)]
+
+    def _param_getRF(self, ints, masks, strings):
+        return [("int", 1), ("int", 0), ("int", 2), ("int", 3), ("int", 4), ("int", 0), ("int", 5)]
+
+    def _param_getForward(self, ints, masks, strings):
+        return [("int", 0)]
+
+    # Commeo devices
+
+    def _device_getIDs(self, ints, masks, strings):
+        return [_ids(self.devices)]
+
+    def _device_getInfo(self, ints, masks, strings):
+        device = self.devices[ints[0]]
+        return [("string", device.name), ("int", device.id), ("int", 0x10000 + device.id),
+                ("int", device.device_type), ("int", 1)]
+
+    def _device_getValues(self, ints, masks, strings):
+        device = self.devices[ints[0]]
+        return [("string", device.name), ("int", device.id), ("int", device.state.value),
+                ("int", Util.percentageToValue(device.position)), ("int", Util.percentageToValue(device.target)),
+                ("int", device.flags), ("int", 3), ("int", device.device_type)]
+
+    # Iveo devices
+
+    def _iveo_getIDs(self, ints, masks, strings):
+        return [_ids(self.iveo)]
+
+    def _iveo_getConfig(self, ints, masks, strings):
+        device = self.iveo[ints[0]]
+        return [("string", device.name), ("int", device.id), ("int", 1), ("int", device.device_type)]
+
+    def _iveo_commandManual(self, ints, masks, strings):
+        return [("int", 1)]
+
+    _iveo_commandAutomatic = _iveo_commandManual
+
+    # Groups
+
+    def _group_getIDs(self, ints, masks, strings):
+        return [_ids(self.groups)]
+
+    def _group_read(self, ints, masks, strings):
+        name, members = self.groups[ints[0]]
+        return [("string", name), ("int", ints[0]), _ids(members)]
+
+    def _group_write(self, ints, masks, strings):
+        members = Util.true_in_list(Util.b64bytes_to_bitlist(masks[0]))
+        self.groups[ints[0]] = (strings[0] if strings else f"Group {ints[0]}", members)
+        return [("int", 1)]
+
+    def _group_delete(self, ints, masks, strings):
+        self.groups.pop(ints[0], None)
+        return [("int", 1)]
+
+    # Sensors, senders and senSims
+
+    def _sensor_getIDs(self, ints, masks, strings):
+        return [_ids(self.sensors)]
+
+    def _sensor_getInfo(self, ints, masks, strings):
+        return [("string", self.sensors[ints[0]]), ("int", ints[0]), ("int", 0x20000 + ints[0])]
+
+    def _sensor_getValues(self, ints, masks, strings):
+        if ints[0] not in self.sensors:
+            raise KeyError(ints[0])
+        return [("int", ints[0]), ("int", 1), ("int", 1), ("int", 1), ("int", 1), ("int", 1),
+                ("int", 20), ("int", 0), ("int", 0), ("int", 1000), ("int", 0), ("int", 0)]
+
+    def _sender_getIDs(self, ints, masks, strings):
+        return [_ids(self.senders)]
+
+    def _sender_getInfo(self, ints, masks, strings):
+        return [("string", self.senders[ints[0]]), ("int", ints[0]), ("int", 0x30000 + ints[0]),
+                ("int", 1), ("int", 0)]
+
+    def _sender_getValues(self, ints, masks, strings):
+        if ints[0] not in self.senders:
+            raise KeyError(ints[0])
+        return [("int", ints[0]), ("int", 0)]
+
+    def _senSim_getIDs(self, ints, masks, strings):
+        return [_ids(self.sensims)]
+
+    def _senSim_getConfig(self, ints, masks, strings):
+        return [("string", self.sensims[ints[0]]), ("int", ints[0]), ("int", 1)]
+
+    def _senSim_getValues(self, ints, masks, strings):
+        return [("int", ints[0]), *(("int", value) for value in self.sensim_values[ints[0]])]
+
+    def _senSim_setValues(self, ints, masks, strings):
+        if ints[0] not in self.sensims or len(ints) != 11:
+            raise KeyError(ints[0])
+        self.sensim_values[ints[0]] = ints[1:]
+        return [("int", 1)]
+
+    # Commands
+
+    def _command_device(self, ints, masks, strings):
+        id, command, _type, param = ints
+        self._drive_ids([id], DriveCommandCommeo(command), param)
+        return [("int", 1)]
+
+    def _command_group(self, ints, masks, strings):
+        id, command, _type, param = ints
+        self._drive_ids(self.groups[id][1], DriveCommandCommeo(command), param)
+        return [("int", 1)]
+
+    def _command_groupMan(self, ints, masks, strings):
+        command, _type, param = ints
+        ids = Util.true_in_list(Util.b64bytes_to_bitlist(masks[0]))
+        self._drive_ids(ids, DriveCommandCommeo(command), param)
+        return [("int", 1), _ids(ids)]
+
+    def _command_result(self, ints, masks, strings):
+        command, executed, failed = self._last_result
+        return [("int", command.value), ("int", 1), ("int", int(not failed)), _ids(executed), _ids(failed)]
+
+    def _drive_ids(self, ids, command: DriveCommandCommeo, param: int) -> None:
+        """Drive the covers with the given ids. Ids without a cover fail, as if out of reach."""
+        executed = [id for id in ids if id in self.devices]
+        for id in executed:
+            self._drive(self.devices[id], command, param)
+        self._last_result = (command, executed, [id for id in ids if id not in self.devices])
+
+    def _drive(self, device: EmulatedCover, command: DriveCommandCommeo, param: int) -> None:
+        """Start moving a cover and report its position until it has arrived."""
+        if command is DriveCommandCommeo.STOP:
+            device.target = device.position
+        elif command is DriveCommandCommeo.DRIVEUP:
+            device.target = OPEN
+        elif command is DriveCommandCommeo.DRIVEDOWN:
+            device.target = CLOSED
+        elif command is DriveCommandCommeo.DRIVEPOS:
+            device.target = Util.valueToPercentage(param)
+        elif command is DriveCommandCommeo.DRIVEPOS1:
+            device.target = device.pos1
+        elif command is DriveCommandCommeo.DRIVEPOS2:
+            device.target = device.pos2
+        elif command is DriveCommandCommeo.SAVEPOS1:
+            device.pos1 = device.position
+        elif command is DriveCommandCommeo.SAVEPOS2:
+            device.pos2 = device.position
+        elif command is DriveCommandCommeo.STEPUP:
+            device.target = max(OPEN, device.position - 5)
+        elif command is DriveCommandCommeo.STEPDOWN:
+            device.target = min(CLOSED, device.position + 5)
+        self.traffic = min(100, self.traffic + 1)
+        self._step(device)
+
+    def _step(self, device: EmulatedCover) -> None:
+        if device.position == device.target:
+            if device.state is not MovementState.STOPPED_OFF:
+                device.state = MovementState.STOPPED_OFF
+                self.send_device_event(device.id)
+            return
+        device.state = MovementState.DOWN_ON if device.target > device.position else MovementState.UP_ON
+        step = max(1, round(100 * self.event_interval / self.travel_time))
+        if device.target > device.position:
+            device.position = min(device.target, device.position + step)
+        else:
+            device.position = max(device.target, device.position - step)
+        self.send_device_event(device.id)
+        self._schedule(self.event_interval, lambda: self._step(device))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--iveo", type=int, default=2)
+    parser.add_argument("--groups", type=int, default=2)
+    parser.add_argument("--sensors", type=int, default=1)
+    parser.add_argument("--senders", type=int, default=1)
+    parser.add_argument("--sensims", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds until an answer is sent")
+    parser.add_argument("--loss", type=float, default=0.0, help="probability that a request is not answered")
+    parser.add_argument("--event-loss", type=float, default=0.0, help="probability that an event is not sent")
+    args = parser.parse_args()
+
+    emulator = GatewayEmulator(
+        args.devices, args.iveo, args.groups, args.sensors, args.senders, args.sensims,
+        latency=args.latency, loss=args.loss, event_loss=args.event_loss,
+    )
+    print(f"Emulated gateway listening on {emulator.start()}, press Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+        print(f"{emulator.request_count} requests, {emulator.dropped_count} dropped")
+
+
+if __name__ == "__main__":
+    main()
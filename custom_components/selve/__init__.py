@@ -4,32 +4,151 @@ Support for Selve devices.
 
 from __future__ import annotations
 import asyncio
+from enum import Enum
 
 from homeassistant.config_entries import SOURCE_IMPORT, ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, callback, ServiceResponse, SupportsResponse
-from .const import DOMAIN
+from homeassistant.core import HomeAssistant, ServiceCall, callback, ServiceResponse
+from .const import DOMAIN, CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW, CONF_EVENT_TYPES, CONF_EVENT_RATE_LIMIT, SELVE_EVENT_TYPES, SIGNAL_SENDER_EVENT
 from collections import defaultdict
+from typing import Callable
 import logging
+import time
 import voluptuous as vol
-from homeassistant.const import CONF_PORT
+from homeassistant.const import CONF_PORT, MATCH_ALL
 from homeassistant.helpers import config_validation as cv, entity_platform, service
 from homeassistant.helpers.entity import Entity
-from homeassistant.exceptions import PlatformNotReady
-from homeassistant.helpers import device_registry as dr
-from selve import Selve, PortError, DutyCycleResponse, SenderEventResponse, CommeoDeviceEventResponse, SensorEventResponse, LogEventResponse, SenderTeachResultResponse, SensorTeachResultResponse, DeviceScanResultResponse, DeviceFunctions, DeviceType, SelveTypes, MovementState
-from selve import DeviceCommandType, DriveCommandIveo, SenSimCommandType
+from homeassistant.exceptions import HomeAssistantError, PlatformNotReady
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from selve import Selve, PortError, DutyCycleResponse, SenderEventResponse, CommeoDeviceEventResponse, SensorEventResponse, LogEventResponse, SenderTeachResultResponse, SensorTeachResultResponse, DeviceScanResultResponse, DeviceFunctions, DeviceType, SelveTypes, MovementState, DutyMode
+from selve import DeviceCommandType, DriveCommandCommeo, DriveCommandIveo, SenSimCommandType, Util
+from selve import SelveDevice, IveoDevice, SelveGroup, SelveSensor, SelveSender, SelveSenSim
+from selve import windDigital, rainDigital, tempDigital, lightDigital
+from .controller import SelveController
+from .ratelimit import TokenBucket
+from .scheduler import CommandScheduler, PACING_THRESHOLD
+from .estimator import PositionEstimator, OPENING, CLOSING, STOPPED
+from .groups import GroupIndex, group_member_ids
+from .health import HealthMonitor
+from .reconciler import DeviceReconciler
+from .services import async_setup_services
+from .storage import SelveDeviceStore
+from .telemetry import TelemetryPoller
 
 REQUIREMENTS = ["python-selve-new"]
 PLATFORMS = ["cover"]  # , "switch", "light", "climate"]
+# Platforms set up by the gateway once it is connected
+GATEWAY_PLATFORMS = ["cover", "binary_sensor", "sensor", "number", "event"]
 
 DS_BOOTLOADER = "Bootloader loading"
 DS_UPDATE = "Updating"
 DS_STARTUP = "Startup"
 DS_READY = "Ready"
 
+# Number of device value requests in flight at the same time
+REFRESH_CONCURRENCY = 4
+
+# Values written to a SenSim within this many seconds are sent in one request
+SENSIM_WRITE_DELAY = 0.1
+
+# Device info read again for the cached devices after a start from the cache
+DEVICE_INFO_ATTRIBUTES = {
+    SelveTypes.DEVICE: ("name", "device_sub_type", "rfAdress"),
+    SelveTypes.IVEO: ("name", "device_sub_type", "activity"),
+    SelveTypes.GROUP: ("name", "mask"),
+    SelveTypes.SENSOR: ("name", "rfAdress"),
+    SelveTypes.SENDER: ("name", "rfAdress", "channel"),
+    SelveTypes.SENSIM: ("name", "activity"),
+}
+
 
 _LOGGER = logging.getLogger(__name__)
 
+SELVE_EVENT = "selve_event"
+
+# Event type and payload fields of the selve_event fired for each response class
+EVENT_TYPES = {
+    SenderEventResponse: ("sender_event", (
+        "senderName", "id", "event", "parameters",
+    )),
+    DutyCycleResponse: ("dutycycle_event", (
+        "mode", "traffic",
+    )),
+    CommeoDeviceEventResponse: ("commeo_event", (
+        "parameters", "actorState", "alarm", "automaticMode", "dayMode", "deviceType",
+        "freezingAlarm", "gatewayNotLearned", "id", "lostSensor", "name", "obstructed",
+        "overload", "rainAlarm", "targetValue", "value", "unreachable", "windAlarm",
+    )),
+    SensorEventResponse: ("sensor_event", (
+        "dayLightAnalog", "id", "lightDigital", "name", "parameters", "rainDigital",
+        "sensorState", "sun1Analog", "sun2Analog", "sun3Analog", "tempAnalog",
+        "tempDigital", "windAnalog", "windDigital",
+    )),
+    LogEventResponse: ("log_event", (
+        "parameters", "logCode", "logDescription", "logStamp", "logType", "logValue", "name",
+    )),
+    SenderTeachResultResponse: ("sender_teach_event", (
+        "parameters", "name", "senderEvent", "senderId", "teachState", "timeLeft",
+    )),
+    SensorTeachResultResponse: ("sensor_teach_event", (
+        "parameters", "foundId", "name", "teachState", "timeLeft",
+    )),
+    DeviceScanResultResponse: ("device_scan_event", (
+        "parameters", "name", "foundIds", "noNewDevices", "scanState",
+    )),
+}
+UNKNOWN_EVENT = ("unknown_event", ())
+
+# Response fields of device_get_values_bulk and the device attributes they are read from
+DEVICE_VALUE_FIELDS = (
+    ("movementState", "state"), ("value", "value"), ("targetValue", "targetValue"),
+    ("unreachable", "unreachable"), ("overload", "overload"), ("obstructed", "obstructed"),
+    ("alarm", "alarm"), ("lostSensor", "lostSensor"), ("automaticMode", "automaticMode"),
+    ("gatewayNotLearned", "gatewayNotLearned"), ("windAlarm", "windAlarm"),
+    ("rainAlarm", "rainAlarm"), ("freezingAlarm", "freezingAlarm"), ("dayMode", "dayMode"),
+)
+
+# Values of a sensor read with sensorGetValues, afterwards kept up to date by sensor events
+SENSOR_VALUE_ATTRIBUTES = (
+    "windDigital", "rainDigital", "tempDigital", "lightDigital", "sensorState",
+    "tempAnalog", "windAnalog", "sun1Analog", "dayLightAnalog", "sun2Analog", "sun3Analog",
+)
+
+# Service fields of the values of a SenSim and their attributes, in the order of senSimSetValues
+SENSIM_VALUE_FIELDS = (
+    ("wind_digital", "windDigital"), ("rain_digital", "rainDigital"), ("temp_digital", "tempDigital"),
+    ("light_digital", "lightDigital"), ("temp_analog", "tempAnalog"), ("wind_analog", "windAnalog"),
+    ("sun_1_analog", "sun1Analog"), ("day_light_analog", "dayLightAnalog"), ("sun_2_analog", "sun2Analog"),
+    ("sun_3_analog", "sun3Analog"),
+)
+# Digital SenSim values, kept as enums on the SenSim
+SENSIM_DIGITAL_VALUES = {
+    "windDigital": windDigital, "rainDigital": rainDigital, "tempDigital": tempDigital, "lightDigital": lightDigital,
+}
+
+# Actions accepted by move_many besides a position, as Commeo drive commands
+MOVE_ACTIONS = {
+    "open": DriveCommandCommeo.DRIVEUP,
+    "close": DriveCommandCommeo.DRIVEDOWN,
+    "stop": DriveCommandCommeo.STOP,
+    "pos1": DriveCommandCommeo.DRIVEPOS1,
+    "pos2": DriveCommandCommeo.DRIVEPOS2,
+}
+# Controller methods moving a single Iveo device or a group, per drive command
+IVEO_MOVES = {
+    DriveCommandCommeo.DRIVEUP: "moveDeviceUp",
+    DriveCommandCommeo.DRIVEDOWN: "moveDeviceDown",
+    DriveCommandCommeo.STOP: "stopDevice",
+    DriveCommandCommeo.DRIVEPOS1: "moveDevicePos1",
+    DriveCommandCommeo.DRIVEPOS2: "moveDevicePos2",
+}
+GROUP_MOVES = {
+    DriveCommandCommeo.DRIVEUP: "moveGroupUp",
+    DriveCommandCommeo.DRIVEDOWN: "moveGroupDown",
+    DriveCommandCommeo.STOP: "stopGroup",
+}
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.Schema(
@@ -50,6 +169,7 @@ async def async_setup(hass: HomeAssistant, config: dict):
         conf = {}
 
     hass.data[DOMAIN] = {}
+    async_setup_services(hass)
 
     return True
 
@@ -72,16 +192,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload a config entry."""
     controller = hass.data[DOMAIN][entry.data[CONF_PORT]]
-    platforms = ["cover", "binary_sensor"]
-    unloaded = all(
-        await asyncio.gather(
-            *[
-                hass.config_entries.async_forward_entry_unload(entry, platform)
-                for platform in PLATFORMS
-                if platform in platforms
-            ]
-        )
-    )
+    unloaded = await hass.config_entries.async_unload_platforms(entry, GATEWAY_PLATFORMS)
 
     await controller.async_reset()
     if unloaded:
@@ -89,6 +200,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     return unloaded
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached devices of a config entry."""
+    await SelveDeviceStore(hass, entry.entry_id).async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry):
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", config_entry.version)
@@ -115,24 +231,512 @@ class SelveGateway(object):
         self.gatewayId = None
         self.gatewayFW = None
 
+        # Entities listening for updates of a single device, keyed by (type, id)
+        self._device_listeners = defaultdict(list)
+        self.device_update_count = 0
+        self.state_write_count = 0
+        self.skipped_write_count = 0
+
+        # Devices with pending state writes, flushed once per write window
+        self._dirty_devices = {}
+        self._movement_states = {}
+        self._flush_unsub = None
+        self.coalesced_update_count = 0
+
+        # Received gateway events per selve_event type
+        self.event_counts = defaultdict(int)
+        self.dropped_event_counts = defaultdict(int)
+        self._has_listeners = False
+        self._event_listeners_checked = -1.0
+        self._enabled_event_types = set()
+        self._event_rate_limits = {}
+        self._setup_event_filters()
+
+        # Running value requests per Commeo device id
+        self._refresh_tasks = {}
+        self._refresh_semaphore = asyncio.Semaphore(REFRESH_CONCURRENCY)
+        # Values waiting to be written and the task writing them, per SenSim id
+        self._sensim_writes = {}
+        # The last task writing values, per SenSim id
+        self._sensim_last_writes = {}
+        self.startup_refresh_time = None
+        # When each Commeo device was last updated by an event or a value request
+        self._device_updated_at = {}
+
+        # Devices and their last known values, kept across restarts
+        self._store = SelveDeviceStore(hass, config_entry.entry_id)
+        self._from_cache = False
+
+        # RF commands, paced by the duty cycle of the gateway
+        self.scheduler = CommandScheduler(hass, self._async_update_duty)
+
+        # Estimated positions of calibrated IVEO devices
+        self.position_estimators = {}
+
+        # Aggregated positions of the members of each group
+        self.groups = GroupIndex()
+
+        # Background checks whether the gateway still answers
+        self.health = HealthMonitor(hass, self._async_ping, self._availability_changed)
+
+        # Temperature, duty cycle, LED and forwarding state of the gateway
+        self.telemetry = TelemetryPoller(
+            hass,
+            {
+                "temperature": self._async_read_temperature,
+                "duty": self._async_read_duty,
+                "led": self._async_read_led,
+                "forwarding": self._async_read_forwarding,
+            },
+            self._telemetry_busy,
+            self._telemetry_updated,
+        )
+
+        # Refreshes Commeo devices whose last event has probably been lost
+        self.reconciler = DeviceReconciler(
+            hass,
+            lambda: self.controller.devices[SelveTypes.DEVICE.value],
+            self._device_updated_at,
+            self.async_refresh_device,
+            lambda: self.available,
+        )
+
     @property
     def port(self):
         """Return the host of this bridge."""
         return self.config_entry.data[CONF_PORT]
 
+    @property
+    def write_window(self) -> float:
+        """Return the window in seconds in which entity state writes are coalesced."""
+        return self.config_entry.options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW) / 1000
+
     @property
     def available(self):
-        """Return availability - use cached value to avoid blocking."""
-        # Return True if controller exists and is connected
-        # Avoid blocking async calls that cause "event loop already running" errors
-        return self.controller is not None
+        """Return availability as last determined by the health monitor."""
+        return self.controller is not None and self.health.available
+
+    @property
+    def availability_signal(self) -> str:
+        """Return the dispatcher signal sent when the availability changes."""
+        return f"{DOMAIN}_{self.config_entry.entry_id}_available"
+
+    @property
+    def telemetry_signal(self) -> str:
+        """Return the dispatcher signal sent when a telemetry value changes."""
+        return f"{DOMAIN}_{self.config_entry.entry_id}_telemetry"
 
     async def async_check_available(self):
-        """Async method to actually ping the gateway."""
+        """Ping the gateway now and update the availability."""
+        return await self.health.async_check()
+
+    async def _async_ping(self) -> bool:
+        return await self.controller.pingGateway()
+
+    @callback
+    def _availability_changed(self, available: bool) -> None:
+        async_dispatcher_send(self.hass, self.availability_signal)
+
+    async def _async_setup_platforms(self):
+        """Set up the entity platforms, then read the values of all Commeo devices once.
+
+        If the entities have been created from cached devices, the devices on
+        the gateway are checked first. If devices have been added, removed or
+        changed (e.g. renamed, taught again or given other group members), the
+        entry is reloaded with the updated cache.
+        """
+        await self.hass.config_entries.async_forward_entry_setups(self.config_entry, GATEWAY_PLATFORMS)
+
+        if self._from_cache and await self._async_update_devices():
+            _LOGGER.info("Devices on the gateway have changed, reloading")
+            await self._store.async_save(self.controller)
+            self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+            return
+
+        for group in list(self.controller.devices[SelveTypes.GROUP.value].values()):
+            if group.mask is None:
+                await self._async_read_group(group.id)
+
+        await self.async_startup_refresh()
+        self._store.async_schedule_save(self.controller)
+
+    async def _async_update_devices(self) -> bool:
+        """Apply devices added to, removed from or changed on the gateway. Returns True if there were any."""
+        get_ids = {
+            SelveTypes.DEVICE: self.controller.deviceGetIds,
+            SelveTypes.IVEO: self.controller.iveoGetIds,
+            SelveTypes.GROUP: self.controller.groupGetIds,
+            SelveTypes.SENSOR: self.controller.sensorGetIds,
+            SelveTypes.SENDER: self.controller.senderGetIds,
+            SelveTypes.SENSIM: self.controller.senSimGetIds,
+        }
+        changed = False
+        for device_type, device_get_ids in get_ids.items():
+            response = await device_get_ids()
+            if not response:
+                _LOGGER.warning("Could not read the %s ids from the gateway", device_type.value)
+                continue
+            devices = self.controller.devices[device_type.value]
+            ids = set(response.ids)
+            for id in set(devices) - ids:
+                del devices[id]
+                changed = True
+            for id in sorted(ids):
+                device = await self._async_read_device(device_type, id)
+                if device is None:
+                    continue
+                cached = devices.get(id)
+                if cached is None:
+                    devices[id] = device
+                    changed = True
+                    continue
+                # The cached values are kept, only the info is updated
+                for attribute in DEVICE_INFO_ATTRIBUTES[device_type]:
+                    value = getattr(device, attribute, None)
+                    if getattr(cached, attribute, None) != value:
+                        _LOGGER.debug("%s of %s %s has changed to %s", attribute, device_type.value, id, value)
+                        setattr(cached, attribute, value)
+                        changed = True
+        return changed
+
+    async def _async_read_device(self, device_type: SelveTypes, id: int):
+        """Read a single device from the gateway."""
+        try:
+            if device_type is SelveTypes.DEVICE:
+                info = await self.controller.deviceGetInfo(id)
+                device = SelveDevice(id, device_type=SelveTypes.DEVICE, device_sub_type=info.deviceType)
+                device.name = info.name
+                device.rfAdress = info.rfAddress
+                device.infoState = info.state
+            elif device_type is SelveTypes.IVEO:
+                info = await self.controller.iveoGetType(id)
+                device = IveoDevice(id, device_sub_type=info.deviceType)
+                device.name = info.name
+                device.activity = info.activity
+            elif device_type is SelveTypes.GROUP:
+                info = await self.controller.groupRead(id)
+                device = SelveGroup(id)
+                device.name = info.groupName
+                device.mask = info.mask
+            elif device_type is SelveTypes.SENSOR:
+                info = await self.controller.sensorGetInfo(id)
+                device = SelveSensor(id)
+                if info.name:
+                    device.name = info.name
+                device.rfAdress = info.rfAddress
+            elif device_type is SelveTypes.SENDER:
+                info = await self.controller.senderGetInfo(id)
+                device = SelveSender(id)
+                device.name = info.name
+                device.rfAdress = info.rfAddress
+                device.channel = info.rfChannel
+                device.resetCount = info.rfResetCount
+            else:
+                info = await self.controller.senSimGetConfig(id)
+                device = SelveSenSim(id)
+                if info.name:
+                    device.name = info.name
+                device.activity = info.activity
+        except Exception:
+            _LOGGER.exception("Error when reading %s %s from the gateway", device_type.value, id)
+            return None
+        return device
+
+    def _index_groups(self):
+        """Index the members of all groups and aggregate their current positions."""
+        for group in self.controller.devices[SelveTypes.GROUP.value].values():
+            self.groups.set_group(group.id, group_member_ids(group.mask))
+        for device in self.controller.devices[SelveTypes.DEVICE.value].values():
+            self.groups.update_device(device.id, *self._group_position(device))
+
+    async def _async_read_group(self, group_id: int):
+        """Read the members of a group from the gateway and index them."""
+        group = self.controller.getDevice(group_id, SelveTypes.GROUP)
+        if group is None:
+            return
+        try:
+            response = await self.controller.groupRead(group_id)
+        except Exception:
+            _LOGGER.exception("Error when reading group %s", group_id)
+            return
+        if not response:
+            return
+        group.mask = response.mask
+        self.groups.set_group(group_id, group_member_ids(group.mask))
+        self._schedule_state_write((SelveTypes.GROUP.value, group_id), self.groups.aggregate(group_id).moving)
+
+    @staticmethod
+    def _group_position(device):
+        """Return the cover position and movement direction a device contributes to its groups."""
+        state = device.state
+        if state == MovementState.UP_ON:
+            direction = OPENING
+        elif state == MovementState.DOWN_ON:
+            direction = CLOSING
+        else:
+            direction = STOPPED
+        return 100 - (device.value or 0), direction
+
+    async def async_startup_refresh(self):
+        """Read the values of every Commeo device, sensor and SenSim once, with a bounded number of requests in flight."""
+        start = time.monotonic()
+        device_ids = list(self.controller.devices[SelveTypes.DEVICE.value])
+        sensor_ids = list(self.controller.devices[SelveTypes.SENSOR.value])
+        sensim_ids = list(self.controller.devices[SelveTypes.SENSIM.value])
+        results = await asyncio.gather(
+            *(self.async_refresh_device(id) for id in device_ids),
+            *(self.async_refresh_sensor(id) for id in sensor_ids),
+            *(self.async_refresh_sensim(id) for id in sensim_ids),
+        )
+        self.startup_refresh_time = time.monotonic() - start
+        _LOGGER.info(
+            "Refreshed %d of %d devices, sensors and SenSims in %.2f s",
+            results.count(True), len(results), self.startup_refresh_time,
+        )
+
+    async def async_refresh_device(self, device_id: int) -> bool:
+        """Read the values of a Commeo device. Concurrent calls for the same device share one request."""
+        task = self._refresh_tasks.get(device_id)
+        if task is None:
+            task = self.hass.async_create_task(self._async_refresh_device(device_id))
+            self._refresh_tasks[device_id] = task
+            task.add_done_callback(lambda _: self._refresh_tasks.pop(device_id, None))
+        return await asyncio.shield(task)
+
+    async def _async_refresh_device(self, device_id: int) -> bool:
+        # The controller applies the response to the device itself
+        async with self._refresh_semaphore:
+            try:
+                response = await self.controller.deviceGetValues(device_id)
+            except Exception:
+                _LOGGER.exception("Error when reading the values of device %s", device_id)
+                response = None
+        if not response:
+            # The gateway may have stopped answering
+            self.health.request_check()
+            return False
+        return True
+
+    async def async_refresh_sensor(self, sensor_id: int) -> bool:
+        """Read the values of a sensor. Afterwards its events keep them up to date."""
+        async with self._refresh_semaphore:
+            try:
+                response = await self.controller.sensorGetValues(sensor_id)
+            except Exception:
+                _LOGGER.exception("Error when reading the values of sensor %s", sensor_id)
+                response = None
+        if not response:
+            self.health.request_check()
+            return False
+        sensor = self.controller.getDevice(sensor_id, SelveTypes.SENSOR)
+        if sensor is None:
+            return False
+        # Unlike device values, the library does not apply sensor values itself
+        for attribute in SENSOR_VALUE_ATTRIBUTES:
+            setattr(sensor, attribute, getattr(response, attribute))
+        self.controller.addOrUpdateDevice(sensor, SelveTypes.SENSOR)
+        return True
+
+    async def async_refresh_sensim(self, sensim_id: int) -> bool:
+        """Read the values of a SenSim. Afterwards they are only changed by writing them."""
+        async with self._refresh_semaphore:
+            try:
+                response = await self.controller.senSimGetValues(sensim_id)
+            except Exception:
+                _LOGGER.exception("Error when reading the values of SenSim %s", sensim_id)
+                response = None
+        if not response:
+            self.health.request_check()
+            return False
+        self._update_sensim(sensim_id, **{attribute: getattr(response, attribute) for _, attribute in SENSIM_VALUE_FIELDS})
+        return True
+
+    async def async_set_sensim_values(self, sensim_id: int, values: dict) -> bool:
+        """Write values of a SenSim, keyed by attribute. Returns True if the gateway accepted them.
+
+        senSimSetValues always sets all values, the values not given are sent
+        as cached. Values written for the same SenSim within
+        SENSIM_WRITE_DELAY are merged and sent in one request. A request is
+        only built after the previous one for the same SenSim has been
+        answered, so it is merged with the values that request has written.
+        """
         try:
-            return await self.controller.pingGateway()
+            values = {
+                attribute: SENSIM_DIGITAL_VALUES[attribute](int(value))
+                if attribute in SENSIM_DIGITAL_VALUES else int(value)
+                for attribute, value in values.items()
+            }
+        except ValueError as ex:
+            raise HomeAssistantError(f"Invalid SenSim value: {ex}") from ex
+
+        write = self._sensim_writes.get(sensim_id)
+        if write is None:
+            task = self.hass.async_create_task(
+                self._async_write_sensim(sensim_id, self._sensim_last_writes.get(sensim_id))
+            )
+            write = self._sensim_writes[sensim_id] = ({}, task)
+            self._sensim_last_writes[sensim_id] = task
+        write[0].update(values)
+        return await asyncio.shield(write[1])
+
+    async def _async_write_sensim(self, sensim_id: int, previous: asyncio.Task | None) -> bool:
+        await asyncio.sleep(SENSIM_WRITE_DELAY)
+        if previous is not None:
+            # The cache only holds the previous values once the gateway has accepted them
+            await asyncio.wait([previous])
+        # Values written from now on are sent with the next request
+        values, _ = self._sensim_writes.pop(sensim_id)
+        sensim = self.controller.getDevice(sensim_id, SelveTypes.SENSIM)
+        if sensim is None:
+            return False
+        merged = [values.get(attribute, getattr(sensim, attribute)) for _, attribute in SENSIM_VALUE_FIELDS]
+        try:
+            response = await self.controller.senSimSetValues(
+                sensim_id, *(value.value if isinstance(value, Enum) else value for value in merged)
+            )
         except Exception:
+            _LOGGER.exception("Error when writing the values of SenSim %s", sensim_id)
+            response = False
+        if not response:
+            self.health.request_check()
             return False
+        self._update_sensim(sensim_id, **values)
+        return True
+
+    def _update_sensim(self, sensim_id: int, **attributes) -> None:
+        """Apply config or values read from or written to the gateway to the cached SenSim."""
+        sensim = self.controller.getDevice(sensim_id, SelveTypes.SENSIM)
+        if sensim is None:
+            return
+        for attribute, value in attributes.items():
+            setattr(sensim, attribute, value)
+        self.controller.addOrUpdateDevice(sensim, SelveTypes.SENSIM)
+
+    async def async_send_command(self, command, *args, key=None, coalesce=True, batch=None):
+        """Send an RF command through the scheduler. Returns the command's result.
+
+        Queued commands with the same key are replaced by the newest one unless
+        either was sent with `coalesce=False`. Commands with an equal `batch`
+        may be sent together, see `CommandScheduler.async_send`.
+        """
+        return await self.scheduler.async_send(command, *args, key=key, coalesce=coalesce, batch=batch)
+
+    async def async_move_many(self, moves: dict, command_type=DeviceCommandType.MANUAL) -> tuple[dict, int]:
+        """Move several devices as one job. Returns the result per move and the number of transmissions.
+
+        `moves` maps a caller's key to `(device_type, device, command, param)`.
+        Commeo devices with the same command and parameter are moved with one
+        mask transmission, and the gateway's command result tells which of
+        them have executed it. Iveo devices and groups need a transmission
+        each. All transmissions go through the scheduler, so they are paced by
+        the duty cycle.
+        """
+        masks = defaultdict(list)
+        jobs = []
+        results = {}
+        for key, (device_type, device, command, param) in moves.items():
+            if device_type is SelveTypes.DEVICE:
+                masks[(command, param)].append((key, device))
+                continue
+            if device_type is SelveTypes.GROUP:
+                method = GROUP_MOVES.get(command)
+            else:
+                method = IVEO_MOVES.get(command)
+            if method is None:
+                results[key] = {"success": False, "error": f"{command.name} is not supported by this device"}
+            else:
+                jobs.append(self._async_move_single(key, device_type, device, method, command_type))
+        for (command, param), members in masks.items():
+            jobs.append(self._async_move_mask(members, command, param, command_type))
+
+        for job_results in await asyncio.gather(*jobs):
+            results.update(job_results)
+        return results, len(jobs)
+
+    async def _async_move_single(self, key, device_type, device, method, command_type) -> dict:
+        """Move an Iveo device or a group. They do not report whether they have executed the command."""
+        try:
+            await self.async_send_command(
+                getattr(self.controller, method), device, command_type, key=(device_type.value, device.id)
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            return {key: {"success": False, "error": str(err)}}
+        return {key: {"success": True}}
+
+    async def _async_move_mask(self, members, command, param, command_type) -> dict:
+        """Move Commeo devices with one mask transmission and check the gateway's command result."""
+        devices = [device for _, device in members]
+        try:
+            executed, response = await self.async_send_command(
+                self.controller.moveDevicesMaskWithResult, devices, command, param, command_type
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            return {key: {"success": False, "error": str(err)} for key, _ in members}
+
+        results = {}
+        for key, device in members:
+            if response:
+                success = device.id in response.successIds
+            else:
+                # No command result, only the acknowledgement of the transmission is known
+                success = bool(executed)
+            results[key] = {"success": True} if success else {"success": False, "error": "Not executed"}
+        return results
+
+    def position_estimator(self, device) -> PositionEstimator | None:
+        """Return the position estimator of an IVEO device, or None if its travel times are not calibrated."""
+        estimator = self.position_estimators.get(device.id)
+        if estimator is None:
+            travel_times = self._store.travel_times.get(device.id)
+            if travel_times is None:
+                return None
+            estimator = PositionEstimator(*travel_times, position=100 - (device.value or 0))
+            self.position_estimators[device.id] = estimator
+        return estimator
+
+    async def _async_update_duty(self) -> bool:
+        """Read the duty cycle from the gateway. Returns False if it could not be read."""
+        response = await self.controller.getDuty()
+        if not response:
+            return False
+        self._update_duty(response.dutyMode, response.rfTraffic)
+        return True
+
+    @callback
+    def _update_duty(self, mode: DutyMode, traffic: int) -> None:
+        """Apply a duty cycle pushed by or read from the gateway."""
+        self.scheduler.update_duty(mode is DutyMode.BLOCKED, traffic)
+        self.telemetry.record("duty", (mode, traffic))
+
+    async def _async_read_temperature(self):
+        response = await self.controller.getTemperature()
+        return response.temperature if response else None
+
+    async def _async_read_duty(self):
+        response = await self.controller.getDuty()
+        if not response:
+            return None
+        self.scheduler.update_duty(response.dutyMode is DutyMode.BLOCKED, response.rfTraffic)
+        return response.dutyMode, response.rfTraffic
+
+    async def _async_read_led(self):
+        response = await self.controller.getLED()
+        return response.ledmode if response else None
+
+    async def _async_read_forwarding(self):
+        response = await self.controller.getForward()
+        return response.forwarding if response else None
+
+    def _telemetry_busy(self, key: str) -> bool:
+        """Return True if telemetry polls should wait because the gateway is busy or unavailable."""
+        if not self.available or self.scheduler.queue_depth:
+            return True
+        # The duty cycle is still polled, otherwise a high RF traffic would not be seen to drop
+        return key != "duty" and (self.scheduler.blocked or self.scheduler.traffic > PACING_THRESHOLD)
+
+    @callback
+    def _telemetry_updated(self) -> None:
+        async_dispatcher_send(self.hass, self.telemetry_signal)
 
     async def async_setup(self):
         port = self.port
@@ -140,19 +744,28 @@ class SelveGateway(object):
         loop=asyncio.get_running_loop()
 
 
+        # Start from the cached devices and check them against the gateway later
+        cache = await self._store.async_load()
+        self._from_cache = cache is not None
+
         try:
-            self.controller = Selve(port=port, logger=_LOGGER, loop=loop)
-            await self.controller.setup(discover=True)
+            self.controller = SelveController(port=port, logger=_LOGGER, loop=loop, device_updated=self._device_updated, responded=self.health.record_activity)
+            await self.controller.setup(discover=not self._from_cache)
         except PortError as ex:
             _LOGGER.exception("Error when trying to connect to the selve gateway - trying autodetection")
             try:
-                self.controller = Selve(port=port, logger=_LOGGER)
-                await self.controller.setup(discover=True)
+                self.controller = SelveController(port=port, logger=_LOGGER, device_updated=self._device_updated, responded=self.health.record_activity)
+                await self.controller.setup(discover=not self._from_cache)
             except Exception as e:
                 _LOGGER.exception("Error when trying to connect to the selve gateway - also failed with autodetection")
 
             return False
 
+        if self._from_cache:
+            SelveDeviceStore.restore(self.controller, cache)
+            # Discovery would have enabled the events
+            await self.controller.setEvents(1, 1, 1, 1, 1)
+
         self.gatewayId = await self.controller.getGatewaySerial()
         self.gatewayFW = await self.controller.getGatewayFirmwareVersion()
 
@@ -173,126 +786,15 @@ class SelveGateway(object):
         self.controller.gateway_id = self.gatewayId
         self.config_entry.async_on_unload(self.config_entry.add_update_listener(self.update_listener))
 
-        self.controller.register_event_callback(self._event_callback)
+        self._index_groups()
 
-        hass.async_create_task(
-            hass.config_entries.async_forward_entry_setups(self.config_entry, ["cover", "binary_sensor"])
-        )
+        self.controller.register_event_callback(self._event_callback)
+        self.scheduler.start(self.config_entry)
+        self.health.start(self.config_entry)
+        self.telemetry.start(self.config_entry)
+        self.reconciler.start(self.config_entry)
 
-        # Gateway
-        hass.services.async_register(DOMAIN, 'ping_gateway', self.ping_gateway, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'gateway_state', self.gateway_state, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_gateway_firmware_version', self.get_gateway_firmware_version, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_gateway_serial', self.get_gateway_serial, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_gateway_spec', self.get_gateway_spec, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'reset', self.reset, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'factory_reset_gateway', self.factory_reset_gateway, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'set_led', self.set_led, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_led', self.get_led, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'update_all_devices', self.update_all_devices)
-        hass.services.async_register(DOMAIN, 'set_forward', self.set_forward, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_forward', self.get_forward, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'set_events', self.set_events, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_events', self.get_events, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_duty', self.get_duty, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_rf', self.get_rf, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'set_duty', self.set_duty, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'set_rf', self.set_rf, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'get_temperature', self.get_temperature, supports_response=SupportsResponse.OPTIONAL)
-
-        #Devices
-        hass.services.async_register(DOMAIN, 'device_scan_start', self.device_scan_start, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_scan_stop', self.device_scan_stop, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_scan_result', self.device_scan_result, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_save', self.device_save, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_get_ids', self.device_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_get_info', self.device_get_info, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_get_values', self.device_get_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_function', self.device_set_function, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_label', self.device_set_label, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_type', self.device_set_type, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_delete', self.device_delete, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_write_manual', self.device_write_manual, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_update_values', self.device_update_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_value', self.device_set_value, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_target_value', self.device_set_target_value, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_set_state', self.device_set_state, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_up', self.device_move_up, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_down', self.device_move_down, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_pos1', self.device_move_pos1, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_pos2', self.device_move_pos2, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_pos', self.device_move_pos, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_stop', self.device_move_stop, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_step_up', self.device_move_step_up, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_move_step_down', self.device_move_step_down, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_save_pos1', self.device_save_pos1, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'device_save_pos2', self.device_save_pos2, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'command_result', self.command_result, supports_response=SupportsResponse.OPTIONAL)
-
-        #Group
-        hass.services.async_register(DOMAIN, 'group_read', self.group_read, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_write', self.group_write, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_get_ids', self.group_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_delete', self.group_delete, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_move_up', self.group_move_up, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_move_down', self.group_move_down, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'group_stop', self.group_stop, supports_response=SupportsResponse.OPTIONAL)
-
-        #Iveo
-        hass.services.async_register(DOMAIN, 'iveo_set_repeater', self.iveo_set_repeater, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_get_repeater', self.iveo_get_repeater, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_set_label', self.iveo_set_label, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_set_type', self.iveo_set_type, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_get_type', self.iveo_get_type, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_get_ids', self.iveo_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_factory_reset', self.iveo_factory_reset, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_teach', self.iveo_teach, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_learn', self.iveo_learn, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_command_manual', self.iveo_command_manual, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_command_automatic', self.iveo_command_automatic, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'iveo_command_result', self.iveo_command_result, supports_response=SupportsResponse.OPTIONAL)
-
-        #Sensor
-        hass.services.async_register(DOMAIN, 'sensor_teach_start', self.sensor_teach_start, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_teach_stop', self.sensor_teach_stop, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_teach_result', self.sensor_teach_result, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_get_ids', self.sensor_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_get_info', self.sensor_get_info, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_get_values', self.sensor_get_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_set_label', self.sensor_set_label, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_delete', self.sensor_delete, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_write_manual', self.sensor_write_manual, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensor_update_values', self.sensor_update_values, supports_response=SupportsResponse.OPTIONAL)
-        
-        #Sender
-        hass.services.async_register(DOMAIN, 'sender_teach_start', self.sender_teach_start, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_teach_stop', self.sender_teach_stop, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_teach_result', self.sender_teach_result, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_get_ids', self.sender_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_get_info', self.sender_get_info, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_get_values', self.sender_get_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_set_label', self.sender_set_label, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_delete', self.sender_delete, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_write_manual', self.sender_write_manual, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sender_update_values', self.sender_update_values, supports_response=SupportsResponse.OPTIONAL)
-
-        #SenSim
-        hass.services.async_register(DOMAIN, 'sensim_get_ids', self.sensim_get_ids, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_get_config', self.sensim_get_config, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_set_config', self.sensim_set_config, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_get_values', self.sensim_get_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_set_values', self.sensim_set_values, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_set_label', self.sensim_set_label, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_drive', self.sensim_drive, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_store', self.sensim_store, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_delete', self.sensim_delete, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_factory', self.sensim_factory, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_get_test', self.sensim_get_test, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'sensim_set_test', self.sensim_set_test, supports_response=SupportsResponse.OPTIONAL)
-
-        #Firmware
-        hass.services.async_register(DOMAIN, 'firmware_get_version', self.firmware_get_version, supports_response=SupportsResponse.OPTIONAL)
-        hass.services.async_register(DOMAIN, 'firmware_update', self.firmware_update, supports_response=SupportsResponse.OPTIONAL)
+        hass.async_create_task(self._async_setup_platforms())
 
         return True
 
@@ -396,6 +898,7 @@ class SelveGateway(object):
     ) -> None:
         """"""
         response = await self.controller.getForward()
+        self.telemetry.record("forwarding", response.forwarding)
 
         return {
             "forwarding": response.forwarding,
@@ -436,6 +939,7 @@ class SelveGateway(object):
     ) -> None:
         """"""
         response = await self.controller.getDuty()
+        self._update_duty(response.dutyMode, response.rfTraffic)
 
         return {
             "dutyMode": response.dutyMode,
@@ -459,6 +963,17 @@ class SelveGateway(object):
             "resetCount": response.resetCount,
         }
     
+    async def get_stats(
+            self, service: ServiceCall
+    ) -> None:
+        """Get count, errors and latency of the controller calls per method."""
+        return {
+            "calls": {
+                name: stats.as_dict()
+                for name, stats in sorted(self.controller.call_stats.items())
+            },
+        }
+    
     async def set_duty(
             self, service: ServiceCall
     ) -> None:
@@ -487,6 +1002,7 @@ class SelveGateway(object):
     ) -> None:
         """Get gateway temperature."""
         response = await self.controller.getTemperature()
+        self.telemetry.record("temperature", response.temperature)
 
         return {
             "temperature": response.temperature,
@@ -583,6 +1099,66 @@ class SelveGateway(object):
             "dayMode": response.dayMode,
         }
     
+    async def device_get_values_bulk(
+            self, service: ServiceCall
+    ) -> ServiceResponse:
+        """Get the values of several Commeo devices, read from the gateway or the cache."""
+        ids = service.data.get("ids", "all")
+        if ids == "all":
+            ids = list(self.controller.devices[SelveTypes.DEVICE.value])
+        elif isinstance(ids, str):
+            ids = [int(id) for id in ids.split(",")]
+        else:
+            ids = [int(id) for id in ids]
+        max_age = service.data.get("max_age")
+
+        return await self.async_get_device_values(ids, None if max_age is None else float(max_age))
+
+    async def async_get_device_values(self, ids: list[int], max_age: float | None = None) -> dict:
+        """Return the values of Commeo devices.
+
+        Devices updated by an event or a request within the last `max_age`
+        seconds are answered from the cache, the others are read from the
+        gateway through the bounded refresh pipeline, see
+        `async_refresh_device`. Devices that are unknown or could not be read
+        are listed as failed.
+        """
+        known = self.controller.devices[SelveTypes.DEVICE.value]
+        ids = list(dict.fromkeys(ids))
+        now = time.monotonic()
+        to_read = [
+            id for id in ids
+            if id in known and (max_age is None or now - self._device_updated_at.get(id, float("-inf")) > max_age)
+        ]
+        results = await asyncio.gather(*(self.async_refresh_device(id) for id in to_read))
+        read = dict(zip(to_read, results))
+
+        now = time.monotonic()
+        devices = []
+        failed = []
+        for id in ids:
+            device = known.get(id)
+            if device is None or read.get(id) is False:
+                failed.append(id)
+                continue
+            updated_at = self._device_updated_at.get(id)
+            values = {
+                "id": id,
+                "source": "gateway" if id in read else "cache",
+                "age": None if updated_at is None else round(now - updated_at, 3),
+            }
+            for field, attribute in DEVICE_VALUE_FIELDS:
+                value = getattr(device, attribute, None)
+                values[field] = value.name if isinstance(value, Enum) else value
+            devices.append(values)
+
+        return {
+            "devices": devices,
+            "failed": failed,
+            "read_count": len(to_read),
+            "cached_count": len(ids) - len(to_read) - len(set(ids) - set(known)),
+        }
+    
     async def device_set_function(
             self, service: ServiceCall
     ) -> None:
@@ -703,7 +1279,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDeviceUp(dev, command)
+        await self.async_send_command(self.controller.moveDeviceUp, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -718,7 +1294,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDeviceDown(dev, command)
+        await self.async_send_command(self.controller.moveDeviceDown, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -733,7 +1309,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDevicePos1(dev, command)
+        await self.async_send_command(self.controller.moveDevicePos1, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -748,7 +1324,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDevicePos2(dev, command)
+        await self.async_send_command(self.controller.moveDevicePos2, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -764,7 +1340,7 @@ class SelveGateway(object):
         position = int(service.data.get("position", 0))
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDevicePos(dev, position, command)
+        await self.async_send_command(self.controller.moveDevicePos, dev, position, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -779,7 +1355,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.stopDevice(dev, command)
+        await self.async_send_command(self.controller.stopDevice, dev, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -795,7 +1371,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDeviceStepUp(dev, degrees, command)
+        await self.async_send_command(self.controller.moveDeviceStepUp, dev, degrees, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -811,7 +1387,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveDeviceStepDown(dev, degrees, command)
+        await self.async_send_command(self.controller.moveDeviceStepDown, dev, degrees, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -826,7 +1402,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data.get("command", "MANUAL")]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.deviceSavePos1(dev, command)
+        await self.async_send_command(self.controller.deviceSavePos1, dev, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -841,7 +1417,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data.get("command", "MANUAL")]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.deviceSavePos2(dev, command)
+        await self.async_send_command(self.controller.deviceSavePos2, dev, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -861,6 +1437,76 @@ class SelveGateway(object):
             "failed_ids": response.failedIds,
         }
     
+    async def move_many(
+            self, service: ServiceCall
+    ) -> ServiceResponse:
+        """Move several devices to their own positions or actions as one job."""
+        command_type = DeviceCommandType[service.data.get("command", "MANUAL")]
+        moves = {}
+        results = {}
+        for key, target in service.data["targets"].items():
+            key = str(key)
+            device_type, device = self._resolve_move_device(key)
+            if device is None:
+                results[key] = {"success": False, "error": "Unknown device"}
+                continue
+            move = self._move_command(device_type, target)
+            if move is None:
+                results[key] = {"success": False, "error": f"Invalid target {target}"}
+                continue
+            moves[key] = (device_type, device, *move)
+
+        move_results, transmissions = await self.async_move_many(moves, command_type)
+        results.update(move_results)
+        results = {str(key): results[str(key)] for key in service.data["targets"]}
+
+        return {
+            "results": results,
+            "succeeded": [key for key, result in results.items() if result["success"]],
+            "failed": [key for key, result in results.items() if not result["success"]],
+            "transmissions": transmissions,
+        }
+
+    def _resolve_move_device(self, key: str):
+        """Return the type and device of a cover entity, device registry id, unique id or Commeo device id."""
+        unique_id = key
+        if "." in key:
+            entity = er.async_get(self.hass).async_get(key)
+            if entity is None or entity.config_entry_id != self.config_entry.entry_id:
+                return None, None
+            unique_id = entity.unique_id
+        else:
+            device_entry = dr.async_get(self.hass).async_get(key)
+            if device_entry is not None:
+                if self.config_entry.entry_id not in device_entry.config_entries:
+                    return None, None
+                unique_id = next((id for domain, id in device_entry.identifiers if domain == DOMAIN), key)
+
+        if unique_id.isdigit():
+            return SelveTypes.DEVICE, self.controller.getDevice(int(unique_id), SelveTypes.DEVICE)
+        for device_type in (SelveTypes.DEVICE, SelveTypes.IVEO, SelveTypes.GROUP):
+            prefix = device_type.value
+            if unique_id.startswith(prefix) and unique_id[len(prefix):].isdigit():
+                return device_type, self.controller.getDevice(int(unique_id[len(prefix):]), device_type)
+        return None, None
+
+    @staticmethod
+    def _move_command(device_type, target):
+        """Return the drive command and parameter for a position (100 is open) or an action."""
+        action = MOVE_ACTIONS.get(str(target).lower())
+        if action is not None:
+            return action, 0
+        try:
+            position = int(target)
+        except (TypeError, ValueError):
+            return None
+        if not 0 <= position <= 100:
+            return None
+        if device_type is not SelveTypes.DEVICE:
+            # Only Commeo devices can be driven to a position
+            return (DriveCommandCommeo.DRIVEUP if position >= 50 else DriveCommandCommeo.DRIVEDOWN), 0
+        return DriveCommandCommeo.DRIVEPOS, Util.percentageToValue(100 - position)
+    
     async def group_read(
             self, service: ServiceCall
     ) -> None:
@@ -883,6 +1529,8 @@ class SelveGateway(object):
         iddict = dict(enumerate(ids, start=1))
         name = str(service.data["name"])
         response = await self.controller.groupWrite(id, iddict, name)
+        if response:
+            await self._async_read_group(id)
 
         return {
             "state": response,
@@ -904,6 +1552,7 @@ class SelveGateway(object):
         """"""
         id = int(service.data["id"])
         response = await self.controller.groupDelete(id)
+        self.groups.remove_group(id)
 
         return {
             "state": response,
@@ -918,7 +1567,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveGroupUp(dev, command)
+        await self.async_send_command(self.controller.moveGroupUp, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -933,7 +1582,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        await self.controller.moveGroupDown(dev, command)
+        await self.async_send_command(self.controller.moveGroupDown, dev, command, key=(type.value, id))
 
         return {
             "state": True,
@@ -948,7 +1597,7 @@ class SelveGateway(object):
         command = DeviceCommandType[service.data["command"]]
 
         dev = self.controller.getDevice(id, type)
-        response = await self.controller.stopGroup(dev, command)
+        response = await self.async_send_command(self.controller.stopGroup, dev, command, key=(type.value, id), coalesce=False)
 
         return {
             "state": True,
@@ -1074,7 +1723,7 @@ class SelveGateway(object):
         """"""
         id = int(service.data["id"])
         command = DriveCommandIveo[service.data["command"]]
-        response = await self.controller.iveoCommandManual(id, command)
+        response = await self.async_send_command(self.controller.iveoCommandManual, id, command)
 
         return {
             "state": response,
@@ -1086,7 +1735,7 @@ class SelveGateway(object):
         """"""
         id = int(service.data["id"])
         command = DriveCommandIveo[service.data["command"]]
-        response = await self.controller.iveoCommandAutomatic(id, command)
+        response = await self.async_send_command(self.controller.iveoCommandAutomatic, id, command)
 
         return {
             "state": response,
@@ -1104,6 +1753,30 @@ class SelveGateway(object):
             "executed_ids": response.executedIds,
         }
     
+    async def iveo_set_travel_time(
+            self, service: ServiceCall
+    ) -> None:
+        """Calibrate the travel times of an Iveo device. Times of 0 remove the calibration."""
+        id = int(service.data["id"])
+        travel_time_up = float(service.data["travel_time_up"])
+        travel_time_down = float(service.data["travel_time_down"])
+
+        if travel_time_up > 0 and travel_time_down > 0:
+            self._store.travel_times[id] = (travel_time_up, travel_time_down)
+            estimator = self.position_estimators.get(id)
+            if estimator is not None:
+                estimator.travel_time_up = travel_time_up
+                estimator.travel_time_down = travel_time_down
+        else:
+            self._store.travel_times.pop(id, None)
+            self.position_estimators.pop(id, None)
+        self._store.async_schedule_save(self.controller)
+        self._device_updated(SelveTypes.IVEO, id)
+
+        return {
+            "state": True,
+        }
+    
     async def sensor_teach_start(
             self, service: ServiceCall
     ) -> None:
@@ -1362,6 +2035,8 @@ class SelveGateway(object):
         """Get SenSim configuration."""
         id = int(service.data["id"])
         response = await self.controller.senSimGetConfig(id)
+        if response:
+            self._update_sensim(id, name=response.name, activity=response.activity)
 
         return {
             "name": response.name,
@@ -1376,6 +2051,8 @@ class SelveGateway(object):
         id = int(service.data["id"])
         activity = bool(service.data["activity"])
         response = await self.controller.senSimSetConfig(id, activity)
+        if response:
+            self._update_sensim(id, activity=activity)
 
         return {
             "state": response,
@@ -1387,6 +2064,8 @@ class SelveGateway(object):
         """Get SenSim sensor values."""
         id = int(service.data["id"])
         response = await self.controller.senSimGetValues(id)
+        if response:
+            self._update_sensim(id, **{attribute: getattr(response, attribute) for _, attribute in SENSIM_VALUE_FIELDS})
 
         return {
             "wind_digital": response.windDigital.value if hasattr(response.windDigital, 'value') else response.windDigital,
@@ -1404,23 +2083,10 @@ class SelveGateway(object):
     async def sensim_set_values(
             self, service: ServiceCall
     ) -> None:
-        """Set SenSim sensor values."""
+        """Set SenSim sensor values. Values not given keep their current value."""
         id = int(service.data["id"])
-        wind_digital = int(service.data.get("wind_digital", 0))
-        rain_digital = int(service.data.get("rain_digital", 0))
-        temp_digital = int(service.data.get("temp_digital", 0))
-        light_digital = int(service.data.get("light_digital", 0))
-        temp_analog = int(service.data.get("temp_analog", 0))
-        wind_analog = int(service.data.get("wind_analog", 0))
-        sun_1_analog = int(service.data.get("sun_1_analog", 0))
-        day_light_analog = int(service.data.get("day_light_analog", 0))
-        sun_2_analog = int(service.data.get("sun_2_analog", 0))
-        sun_3_analog = int(service.data.get("sun_3_analog", 0))
-        response = await self.controller.senSimSetValues(
-            id, wind_digital, rain_digital, temp_digital, light_digital,
-            temp_analog, wind_analog, sun_1_analog, day_light_analog,
-            sun_2_analog, sun_3_analog
-        )
+        values = {attribute: service.data[field] for field, attribute in SENSIM_VALUE_FIELDS if field in service.data}
+        response = await self.async_set_sensim_values(id, values)
 
         return {
             "state": response,
@@ -1433,6 +2099,8 @@ class SelveGateway(object):
         id = int(service.data["id"])
         label = service.data["label"]
         response = await self.controller.senSimSetLabel(id, label)
+        if response:
+            self._update_sensim(id, name=label)
 
         return {
             "state": response,
@@ -1444,7 +2112,7 @@ class SelveGateway(object):
         """Drive SenSim (send simulated sensor values to actuators)."""
         id = int(service.data["id"])
         command = SenSimCommandType[service.data["command"]]
-        response = await self.controller.senSimDrive(id, command)
+        response = await self.async_send_command(self.controller.senSimDrive, id, command)
 
         return {
             "state": response,
@@ -1539,6 +2207,7 @@ class SelveGateway(object):
         state = service.data["state"]
         await self.controller.setLED(state)
         response = await self.controller.getLED()
+        self.telemetry.record("led", response.ledmode)
 
         return {
             "state": response.ledmode,
@@ -1549,6 +2218,7 @@ class SelveGateway(object):
     ) -> ServiceResponse:
         """Set LED"""
         response = await self.controller.getLED()
+        self.telemetry.record("led", response.ledmode)
 
         return {
             "state": response.ledmode,
@@ -1558,149 +2228,159 @@ class SelveGateway(object):
     #Listeners
     async def update_listener(self, hass: HomeAssistant, entry: ConfigEntry):
         """Handle options update."""
-        if entry.options["switch_dir"] is True:
-            flag = 1
-        else:
-            flag = 0
-        self.controller.updateOptions(flag)
-        await self.controller.updateAllDevices()
-        await hass.config_entries.async_reload(entry.entry_id)
+        # All other options are read when they are used
+        self._setup_event_filters()
 
     #Callbacks
 
     @callback
-    def _event_callback(self, response):
-        """Is called when an event arrives."""
+    def async_add_device_listener(self, device_type: SelveTypes, device_id: int, update_callback) -> Callable[[], None]:
+        """Listen for updates of a single device. Returns a function to remove the listener.
+
+        The listener returns True if it has written its state and False if the
+        values it reports were unchanged.
+        """
+        key = (device_type.value, device_id)
+        self._device_listeners[key].append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            listeners = self._device_listeners.get(key)
+            if listeners is None:
+                return
+            if update_callback in listeners:
+                listeners.remove(update_callback)
+            if not listeners:
+                del self._device_listeners[key]
+
+        return remove_listener
 
-        event_data = {}
+    @callback
+    def _device_updated(self, device_type: SelveTypes, device_id: int):
+        """Is called by the controller when a single device has been updated.
+
+        Changes of the movement state (a cover starts or stops moving) are
+        written immediately, all other updates are collected and written once
+        per write window.
+        """
+        self.device_update_count += 1
+        if device_type is SelveTypes.DEVICE:
+            self._device_updated_at[device_id] = time.monotonic()
+        self._store.async_schedule_save(self.controller)
+
+        device = None
+        if device_type is SelveTypes.DEVICE:
+            device = self.controller.getDevice(device_id, device_type)
+            if device is not None:
+                for group_id in self.groups.update_device(device_id, *self._group_position(device)):
+                    self._schedule_state_write((SelveTypes.GROUP.value, group_id), self.groups.aggregate(group_id).moving)
+
+        key = (device_type.value, device_id)
+        if key not in self._device_listeners:
+            return
+        if device is None:
+            device = self.controller.getDevice(device_id, device_type)
+        self._schedule_state_write(key, getattr(device, "state", None))
 
-        if isinstance(response, SenderEventResponse):
+    @callback
+    def _schedule_state_write(self, key, state):
+        """Write the state of a device, or collect it for the next flush if its movement state is unchanged."""
+        if key not in self._device_listeners:
+            return
+        if self.write_window <= 0 or self._movement_states.get(key) != state:
+            self._movement_states[key] = state
+            self._dirty_devices.pop(key, None)
+            self._write_device_state(key)
+            return
+
+        if key in self._dirty_devices:
+            self.coalesced_update_count += 1
+            return
+        self._dirty_devices[key] = None
+        if self._flush_unsub is None:
+            self._flush_unsub = async_call_later(self.hass, self.write_window, self._flush_dirty_devices)
 
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "sender_event",
-                "senderName": response.senderName,
-                "id": response.id,
-                "event": response.event,
-                "parameters": response.parameters
-            }
+    @callback
+    def _flush_dirty_devices(self, _now=None):
+        """Write the state of all devices updated during the last write window."""
+        self._flush_unsub = None
+        dirty = self._dirty_devices
+        self._dirty_devices = {}
+        for key in dirty:
+            self._write_device_state(key)
 
-        
-        if isinstance(response, DutyCycleResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "dutycycle_event",
-                "mode": response.mode,
-                "traffic": response.traffic
-            }
+    @callback
+    def _write_device_state(self, key):
+        """Notify the listeners of a device."""
+        listeners = self._device_listeners.get(key)
+        if not listeners:
+            return
+        for update_callback in list(listeners):
+            if update_callback():
+                self.state_write_count += 1
+            else:
+                self.skipped_write_count += 1
 
-        if isinstance(response, CommeoDeviceEventResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "commeo_event",
-                "parameters": response.parameters,
-                "actorState": response.actorState,
-                "alarm": response.alarm,
-                "automaticMode": response.automaticMode,
-                "dayMode": response.dayMode,
-                "deviceType": response.deviceType,
-                "freezingAlarm": response.freezingAlarm,
-                "gatewayNotLearned": response.gatewayNotLearned,
-                "id": response.id,
-                "lostSensor": response.lostSensor,
-                "name": response.name,
-                "obstructed": response.obstructed,
-                "overload": response.overload,
-                "rainAlarm": response.rainAlarm,
-                "targetValue": response.targetValue,
-                "value": response.value,
-                "unreachable": response.unreachable,
-                "windAlarm": response.windAlarm
-            }
+    @property
+    def writes_per_update(self) -> float:
+        """Average number of entity state writes per device update."""
+        if not self.device_update_count:
+            return 0.0
+        return self.state_write_count / self.device_update_count
 
-        if isinstance(response, SensorEventResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "sensor_event",
-                "dayLightAnalog": response.dayLightAnalog,
-                "id": response.id,
-                "lightDigital": response.lightDigital,
-                "name": response.name,
-                "parameters": response.parameters,
-                "rainDigital": response.rainDigital,
-                "sensorState": response.sensorState,
-                "sun1Analog": response.sun1Analog,
-                "sun2Analog": response.sun2Analog,
-                "sun3Analog": response.sun3Analog,
-                "tempAnalog": response.tempAnalog,
-                "tempDigital": response.tempDigital,
-                "windAnalog": response.windAnalog,
-                "windDigital": response.windDigital
-            }
+    @callback
+    def _setup_event_filters(self):
+        """Read the enabled selve_event types and their rate limits from the options."""
+        options = self.config_entry.options
+        self._enabled_event_types = set(options.get(CONF_EVENT_TYPES, SELVE_EVENT_TYPES))
+        self._event_rate_limits = {}
+        for event_type in self._enabled_event_types:
+            rate = options.get(CONF_EVENT_RATE_LIMIT.format(event_type), 0)
+            if rate:
+                self._event_rate_limits[event_type] = TokenBucket(rate)
 
-        if isinstance(response, LogEventResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "log_event",
-                "parameters": response.parameters,
-                "logCode": response.logCode,
-                "logDescription": response.logDescription,
-                "logStamp": response.logStamp,
-                "logType": response.logType,
-                "logValue": response.logValue,
-                "name": response.name
-            }
-        
+    @callback
+    def _has_event_listeners(self) -> bool:
+        """Return True if anything listens for selve_event. Checked at most once per second."""
+        now = time.monotonic()
+        if now - self._event_listeners_checked >= 1:
+            listeners = self.hass.bus.async_listeners()
+            self._has_listeners = bool(listeners.get(SELVE_EVENT) or listeners.get(MATCH_ALL))
+            self._event_listeners_checked = now
+        return self._has_listeners
 
-        if isinstance(response, SenderTeachResultResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "sender_teach_event",
-                "parameters": response.parameters,
-                "name": response.name,
-                "senderEvent": response.senderEvent,
-                "senderId": response.senderId,
-                "teachState": response.teachState,
-                "timeLeft": response.timeLeft
-            }
+    @callback
+    def _event_callback(self, response):
+        """Is called when an event arrives."""
 
-        if isinstance(response, SensorTeachResultResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "sensor_teach_event",
-                "parameters": response.parameters,
-                "foundId": response.foundId,
-                "name": response.name,
-                "teachState": response.teachState,
-                "timeLeft": response.timeLeft
-            }
+        self.health.record_activity()
+        if isinstance(response, DutyCycleResponse):
+            self._update_duty(response.mode, response.traffic)
+        elif isinstance(response, SenderEventResponse):
+            # Only the event entity and device triggers of this sender are connected to its signal
+            async_dispatcher_send(
+                self.hass, SIGNAL_SENDER_EVENT.format(self.config_entry.entry_id, response.id), response.event
+            )
 
-        if isinstance(response, DeviceScanResultResponse):
-            
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "device_scan_event",
-                "parameters": response.parameters,
-                "name": response.name,
-                "foundIds": response.foundIds,
-                "noNewDevices": response.noNewDevices,
-                "scanState": response.scanState
-            }
-        
-        if not event_data:
-            event_data = {
-                "device_id": self.gatewayId,
-                "type": "unknown_event"
-            }
+        event_type, fields = EVENT_TYPES.get(type(response), UNKNOWN_EVENT)
+        self.event_counts[event_type] += 1
+
+        if event_type not in self._enabled_event_types or not self._has_event_listeners():
+            return
+
+        rate_limit = self._event_rate_limits.get(event_type)
+        if rate_limit is not None and not rate_limit.consume():
+            self.dropped_event_counts[event_type] += 1
+            return
 
+        event_data = {
+            "device_id": self.gatewayId,
+            "type": event_type,
+        }
+        for field in fields:
+            event_data[field] = getattr(response, field)
 
-        self.hass.bus.async_fire("selve_event", event_data)
+        self.hass.bus.async_fire(SELVE_EVENT, event_data)
 
 
     async def async_reset(self):
@@ -1710,12 +2390,17 @@ class SelveGateway(object):
         if self.controller is None:
             return True
 
-        await self.hass.config_entries.async_forward_entry_unload(
-            self.config_entry, "binary_sensor"
-        )
+        if self._flush_unsub is not None:
+            self._flush_unsub()
+            self._flush_unsub = None
+        self._dirty_devices.clear()
 
-        await self.hass.config_entries.async_forward_entry_unload(
-            self.config_entry, "cover"
-        )
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
+
+        await self.scheduler.async_stop()
+        await self.health.async_stop()
+        await self.telemetry.async_stop()
+        await self.reconciler.async_stop()
 
         await self.controller.stopGateway()
@@ -1,7 +1,7 @@
 from .const import DOMAIN
 import logging
 import asyncio
-from selve import Selve, PortError
+from selve import Selve, PortError, SelveTypes
 
 from homeassistant.const import CONF_PORT
 from homeassistant.components.binary_sensor import (
@@ -17,6 +17,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers import device_registry
 from .const import DOMAIN
+from .entity import SelveEntity
 
 DEPENDENCIES = ["selve"]
 
@@ -58,7 +59,8 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
     discovery_info=None,
 ):
-    selve: Selve = hass.data[DOMAIN][config_entry.data[CONF_PORT]].controller
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+    selve: Selve = gateway.controller
     # try:
     #     selve.pingGateway() #gateway should already be discovered by cover platform, just ping to make sure
     # except PortError as ex:
@@ -71,32 +73,26 @@ async def async_setup_entry(
         for description in BINARY_SENSORS_TYPES:
             try:
                 devicelist.append(
-                    SelveSensor(selve.devices["device"][id], selve, description)
+                    SelveSensor(selve.devices["device"][id], SelveTypes.DEVICE, gateway, description)
                 )
             except Exception as e:
                 pass
     async_add_entities(devicelist, True)
 
 
-class SelveSensor(BinarySensorEntity):
+class SelveSensor(SelveEntity, BinarySensorEntity):
     def __init__(
-        self, device, selve, description: BinarySensorEntityDescription
+        self, device, device_type, gateway, description: BinarySensorEntityDescription
     ) -> None:
-        self.selve_device = device
-        self._name = f"{str(self.selve_device.name)}  {description.name}"
-        self.selve = selve
         self.description = description
+        super().__init__(device, device_type, gateway)
+        self._name = f"{str(self.selve_device.name)}  {description.name}"
 
         self._unit_of_measurement = None
-        self._state = None
-
-    async def async_added_to_hass(self) -> None:
-        """Run when this Entity has been added to HA."""
-        self.selve.register_callback(self.async_write_ha_state)
 
-    async def async_will_remove_from_hass(self) -> None:
-        """Entity being removed from hass."""
-        self.selve.remove_callback(self.async_write_ha_state)
+    def _state_snapshot(self):
+        """Return the device value this sensor reports."""
+        return getattr(self.selve_device, self.description.key, None)
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -149,11 +145,9 @@ class SelveSensor(BinarySensorEntity):
         """Return the state of the sensor.
 
         The return type of this call depends on the attribute that
-        is configured.
+        is configured. The value is read when the device is updated.
         """
-        attr = getattr(self.selve_device, self.description.key, None)
-        _LOGGER.debug("Attr " + str(self.description.key) + " : " + str(attr))
-        return attr
+        return self._snapshot
 
     @property
     def device_class(self):
@@ -11,10 +11,18 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_PORT
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
 from selve import Selve
 from selve.util.errors import PortError
 
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    CONF_WRITE_WINDOW,
+    DEFAULT_WRITE_WINDOW,
+    CONF_EVENT_TYPES,
+    CONF_EVENT_RATE_LIMIT,
+    SELVE_EVENT_TYPES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -126,12 +134,18 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
 
+    def __init__(self) -> None:
+        self._options: dict[str, Any] = {}
+
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            self._options.update(user_input)
+            if user_input[CONF_EVENT_TYPES]:
+                return await self.async_step_events()
+            return self.async_create_entry(title="", data=self._options)
 
         return self.async_show_form(
             step_id="init",
@@ -140,11 +154,38 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     vol.Required(
                         "open_close_fix",
                         default=self.config_entry.options.get("open_close_fix", False),
-                    ): bool
+                    ): bool,
+                    vol.Required(
+                        CONF_WRITE_WINDOW,
+                        default=self.config_entry.options.get(CONF_WRITE_WINDOW, DEFAULT_WRITE_WINDOW),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+                    vol.Required(
+                        CONF_EVENT_TYPES,
+                        default=self.config_entry.options.get(CONF_EVENT_TYPES, SELVE_EVENT_TYPES),
+                    ): cv.multi_select(SELVE_EVENT_TYPES),
                 }
             ),
         )
 
+    async def async_step_events(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the rate limits of the enabled events."""
+        if user_input is not None:
+            self._options.update(user_input)
+            return self.async_create_entry(title="", data=self._options)
+
+        data_schema = {}
+        for event_type in self._options[CONF_EVENT_TYPES]:
+            key = CONF_EVENT_RATE_LIMIT.format(event_type)
+            data_schema[
+                vol.Required(key, default=self.config_entry.options.get(key, 0))
+            ] = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+        return self.async_show_form(
+            step_id="events", data_schema=vol.Schema(data_schema)
+        )
+
 
 class AlreadyConfigured(HomeAssistantError):
     """Error to indicate this device is already configured."""
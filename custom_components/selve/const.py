@@ -2,6 +2,28 @@
 
 DOMAIN = "selve"
 
+# Options
+CONF_WRITE_WINDOW = "write_coalesce_ms"
+DEFAULT_WRITE_WINDOW = 100
+CONF_EVENT_TYPES = "event_types"
+CONF_EVENT_RATE_LIMIT = "{}_rate_limit"
+
+# Dispatcher signal of the events of a sender, formatted with the config entry id and the sender id
+SIGNAL_SENDER_EVENT = DOMAIN + "_{}_sender_{}"
+
+# Types of the selve_event fired on the bus
+SELVE_EVENT_TYPES = [
+    "commeo_event",
+    "sensor_event",
+    "sender_event",
+    "dutycycle_event",
+    "log_event",
+    "sender_teach_event",
+    "sensor_teach_event",
+    "device_scan_event",
+    "unknown_event",
+]
+
 SELVE_TYPES = {
     0: None,
     1: "cover",
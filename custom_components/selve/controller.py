@@ -0,0 +1,142 @@
+"""
+Selve controller used by the integration.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from typing import Callable
+
+from selve import (
+    Selve,
+    SelveTypes,
+    SelveDevice,
+    SelveSender,
+    CommandGroupMan,
+    DeviceCommandType,
+    DriveCommandCommeo,
+    MovementState,
+    Util,
+)
+
+from .stats import CallStats
+
+# Movement state a Commeo device is in right after a mask command
+MASK_COMMAND_STATES = {
+    DriveCommandCommeo.DRIVEUP: MovementState.UP_ON,
+    DriveCommandCommeo.DRIVEDOWN: MovementState.DOWN_ON,
+}
+
+# Method sending a request and waiting for its response, i.e. the serial round trip
+ROUND_TRIP_METHOD = "executeCommandSyncWithResponse"
+
+
+class SelveController(Selve):
+    """Selve controller that reports which device has changed.
+
+    The library only notifies argumentless callbacks, so every listener has to
+    assume that any device may have changed. This controller additionally
+    reports the type and id of the device that was updated.
+
+    Calls of its public coroutine methods are counted and timed per method in
+    `call_stats`. Calls that raise or return False (the library's result for a
+    request that timed out) are counted as errors. `responded` is called for
+    every request the gateway has answered.
+    """
+
+    def __init__(
+        self,
+        *args,
+        device_updated: Callable[[SelveTypes, int], None] | None = None,
+        responded: Callable[[], None] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._device_updated = device_updated
+        self._responded = responded
+        self.call_stats: dict[str, CallStats] = {}
+        for name, _ in inspect.getmembers(type(self), inspect.iscoroutinefunction):
+            if not name.startswith("_"):
+                setattr(self, name, self._timed(name, getattr(self, name)))
+
+    def _timed(self, name: str, method):
+        """Wrap a coroutine method to record its call statistics."""
+
+        @functools.wraps(method)
+        async def timed(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception:
+                self._record_call(name, time.monotonic() - start, True)
+                raise
+            self._record_call(name, time.monotonic() - start, result is False)
+            if result and name == ROUND_TRIP_METHOD and self._responded is not None:
+                self._responded()
+            return result
+
+        return timed
+
+    def _record_call(self, name: str, seconds: float, error: bool) -> None:
+        stats = self.call_stats.get(name)
+        if stats is None:
+            stats = self.call_stats[name] = CallStats()
+        stats.record(seconds, error)
+
+    def addOrUpdateDevice(self, device, type: SelveTypes):
+        if type is SelveTypes.SENSOR and isinstance(device, SelveSender):
+            # The library files senders updated by their events as sensors
+            type = SelveTypes.SENDER
+        super().addOrUpdateDevice(device, type)
+        if self._device_updated is not None:
+            self._device_updated(type, device.id)
+
+    async def moveDevicesMask(
+        self,
+        devices: list[SelveDevice],
+        command: DriveCommandCommeo,
+        param: int = 0,
+        type=DeviceCommandType.MANUAL,
+    ):
+        """Send a drive command to several Commeo devices in one transmission.
+
+        The devices are not read back, their values are updated by the events
+        the gateway sends while they move. The devices are marked as updated,
+        so a device whose events are lost is refreshed by the reconciler.
+        """
+        executed, _ = await self._move_devices_mask(devices, command, param, type, False)
+        return executed
+
+    async def moveDevicesMaskWithResult(
+        self,
+        devices: list[SelveDevice],
+        command: DriveCommandCommeo,
+        param: int = 0,
+        type=DeviceCommandType.MANUAL,
+    ):
+        """Send a drive command like `moveDevicesMask` and read the gateway's command result.
+
+        The result is requested right after the transmission has been
+        acknowledged, so it belongs to the mask command. Returns whether the
+        command was executed and the command result, or None if it could not
+        be read.
+        """
+        return await self._move_devices_mask(devices, command, param, type, True)
+
+    async def _move_devices_mask(self, devices, command, param, type, read_result: bool):
+        ids = [device.id for device in devices]
+        response = await self.executeCommandSyncWithResponse(CommandGroupMan(command, type, ids, param))
+        if not response:
+            return False, None
+        result = await self.commandResult() if read_result else None
+        state = MASK_COMMAND_STATES.get(command)
+        for device in devices:
+            if state is not None:
+                device.state = state
+            elif command is DriveCommandCommeo.DRIVEPOS:
+                target = Util.valueToPercentage(param)
+                device.targetValue = target if self.reversedStopPosition == 0 else 100 - target
+            self.addOrUpdateDevice(device, SelveTypes.DEVICE)
+        return response.executed, result or None
@@ -4,7 +4,7 @@ Support for Selve cover - shutters etc.
 from .const import DOMAIN
 import logging
 import asyncio
-from selve import Selve, PortError
+from selve import Selve, PortError, SelveTypes, DriveCommandCommeo, Util
 
 import voluptuous as vol
 
@@ -23,12 +23,18 @@ from homeassistant.helpers import device_registry
 from homeassistant.const import ATTR_ENTITY_ID
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from .const import DOMAIN
+from .entity import SelveEntity
+from .estimator import OPENING, CLOSING
 
 DEPENDENCIES = ["selve"]
 
 _LOGGER = logging.getLogger(__name__)
 
+# Seconds between state updates of a moving IVEO cover with estimated position
+ESTIMATE_INTERVAL = 1
+
 SERVICE_SET_POS1 = "selve_set_pos1"
 SERVICE_SET_POS2 = "selve_set_pos2"
 
@@ -60,7 +66,8 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
     discovery_info=None,
 ):
-    selve: Selve = hass.data[DOMAIN][config_entry.data[CONF_PORT]].controller
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+    selve: Selve = gateway.controller
     # try:
     #     await selve.discover()
     # except PortError as ex:
@@ -69,15 +76,16 @@ async def async_setup_entry(
 
     devicelist = []
     for id in selve.devices["device"]:
-        devicelist.append(SelveCover(selve.devices["device"][id], selve, config_entry))
+        devicelist.append(SelveCover(selve.devices["device"][id], SelveTypes.DEVICE, gateway, config_entry))
 
     for id in selve.devices["iveo"]:
-        devicelist.append(SelveCover(selve.devices["iveo"][id], selve, config_entry))
+        devicelist.append(SelveCover(selve.devices["iveo"][id], SelveTypes.IVEO, gateway, config_entry))
 
     for id in selve.devices["group"]:
-        devicelist.append(SelveCover(selve.devices["group"][id], selve, config_entry))
+        devicelist.append(SelveCover(selve.devices["group"][id], SelveTypes.GROUP, gateway, config_entry))
 
-    async_add_entities(devicelist, True)
+    # Values are read once for all devices by the gateway after setup
+    async_add_entities(devicelist)
 
 
 async def update_listener(hass, config_entry):
@@ -85,15 +93,17 @@ async def update_listener(hass, config_entry):
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 
-class SelveCover(CoverEntity):
+class SelveCover(SelveEntity, CoverEntity):
     """Representation a Selve Cover."""
 
-    def __init__(self, device, selve, config_entry) -> None:
-        self.selve_device = device
+    def __init__(self, device, device_type, gateway, config_entry) -> None:
+        super().__init__(device, device_type, gateway)
         self.selve_device.openState = 50
-        self.selve = selve
         self._config_entry = config_entry
         self._name = str(self.selve_device.name)
+        # Timers of an IVEO movement with estimated position
+        self._estimate_unsub = None
+        self._stop_unsub = None
 
     @property
     def open_close_fix(self) -> bool:
@@ -115,16 +125,22 @@ class SelveCover(CoverEntity):
         """Return the state attributes of the device."""
         return {"selve_device_id": self.selve_device.id}
 
-    async def async_added_to_hass(self) -> None:
-        """Run when this Entity has been added to HA."""
-        if self.isCommeo:
-            await self.selve.updateCommeoDeviceValuesAsync(self.selve_device.id)
-
-        self.selve.register_callback(self.async_write_ha_state)
+    def _state_snapshot(self):
+        """Return the device values this entity writes to its state."""
+        if self.isGroup:
+            aggregate = self._aggregate
+            return aggregate.snapshot() if aggregate else None
+        estimator = self._estimator
+        return (
+            self.selve_device.value,
+            self.selve_device.targetValue,
+            self.selve_device.state,
+            (round(estimator.position()), estimator.direction) if estimator else None,
+        )
 
     async def async_will_remove_from_hass(self) -> None:
-        """Entity being removed from hass."""
-        self.selve.remove_callback(self.async_write_ha_state)
+        """Cancel the timers of a running IVEO movement."""
+        self._cancel_estimate_timers()
 
     async def async_update(self):
         """Update method. Not needed when using callbacks."""
@@ -134,7 +150,7 @@ class SelveCover(CoverEntity):
         # self.controller.updateAllDevices()
 
         if self.isCommeo:
-            await self.selve.updateCommeoDeviceValuesAsync(self.selve_device.id)
+            await self.gateway.async_refresh_device(self.selve_device.id)
 
     @property
     def isCommeo(self):
@@ -148,6 +164,18 @@ class SelveCover(CoverEntity):
     def isGroup(self):
         return self.selve_device.device_type.name == "GROUP"
 
+    @property
+    def _aggregate(self):
+        """Return the aggregated positions of the members of a group."""
+        return self.gateway.groups.aggregate(self.selve_device.id)
+
+    @property
+    def _estimator(self):
+        """Return the position estimator of a calibrated IVEO device."""
+        if not self.isIveo:
+            return None
+        return self.gateway.position_estimator(self.selve_device)
+
     @property
     def should_poll(self):
         # Disable polling when using push
@@ -208,9 +236,17 @@ class SelveCover(CoverEntity):
         When open_close_fix is enabled, values 0-1 are clamped to 0 (closed)
         and values 99-100 are clamped to 100 (open) to fix incorrect state
         reporting for covers that report 99 when fully open or 1 when fully closed.
+        Groups report the mean position of their members.
         """
         if self.isGroup:
-            return 50
+            aggregate = self._aggregate
+            if aggregate is None or aggregate.mean is None:
+                return None
+            return round(aggregate.mean)
+
+        estimator = self._estimator
+        if estimator is not None:
+            return round(estimator.position())
 
         value = self.selve_device.value
         if self.open_close_fix:
@@ -247,6 +283,9 @@ class SelveCover(CoverEntity):
     @property
     def is_closed(self):
         """Return if the cover is closed."""
+        if self.isGroup:
+            aggregate = self._aggregate
+            return aggregate.closed if aggregate else None
         if self.current_cover_position is not None:
             #    if self.controller.config.get("switch_dir"):
             #        return self.current_cover_position == 100
@@ -257,13 +296,19 @@ class SelveCover(CoverEntity):
     @property
     def is_opening(self):
         if self.isGroup:
-            return None
+            aggregate = self._aggregate
+            return aggregate.opening > 0 if aggregate else None
+        if (estimator := self._estimator) is not None:
+            return estimator.direction == OPENING
         return self.selve_device.state.name == "UP_ON"
 
     @property
     def is_closing(self):
         if self.isGroup:
-            return None
+            aggregate = self._aggregate
+            return aggregate.closing > 0 if aggregate else None
+        if (estimator := self._estimator) is not None:
+            return estimator.direction == CLOSING
         return self.selve_device.state.name == "DOWN_ON"
 
     @property
@@ -286,10 +331,17 @@ class SelveCover(CoverEntity):
         #         gatewayState = self.controller.state.name
 
         if self.isGroup:
+            aggregate = self._aggregate
+            position = self.current_cover_position
             return {
-                "value": 50,
+                "value": None if position is None else 100 - position,
                 "tiltValue": 0,
-                "targetValue": 50,
+                "targetValue": None if position is None else 100 - position,
+                "positionMin": aggregate.min if aggregate else None,
+                "positionMax": aggregate.max if aggregate else None,
+                "positionMean": position,
+                "moving": aggregate.moving if aggregate else None,
+                "closed": aggregate.closed if aggregate else None,
                 "communicationType": self.selve_device.communicationType.name
                 if self.selve_device.communicationType.name
                 else "",
@@ -306,49 +358,142 @@ class SelveCover(CoverEntity):
             "gatewayState": gatewayState,
         }
 
+    async def _async_send_command(self, command, *args, coalesce=True, mask_command=None, mask_param=0):
+        """Send a command for this device. A queued command for this device is replaced by it.
+
+        Commeo devices given the same `mask_command` and `mask_param` at the
+        same time are moved with a single mask transmission.
+        """
+        batch = None
+        if mask_command is not None and self.isCommeo:
+            batch = (self.selve.moveDevicesMask, mask_command, mask_param)
+        await self.gateway.async_send_command(
+            command,
+            self.selve_device,
+            *args,
+            key=(self.device_type.value, self.selve_device.id),
+            coalesce=coalesce,
+            batch=batch,
+        )
+
     async def async_open_cover(self, **kwargs):
         """Open the cover."""
         if self.isGroup:
-            await self.selve.moveGroupUp(self.selve_device)
+            await self._async_send_command(self.selve.moveGroupUp)
             return
-        await self.selve.moveDeviceUp(self.selve_device)
+        if self._estimator is not None:
+            await self._async_move_estimated(100)
+            return
+        await self._async_send_command(self.selve.moveDeviceUp, mask_command=DriveCommandCommeo.DRIVEUP)
 
     async def async_open_cover_tilt(self, **kwargs):
         """Open the cover."""
-        await self.selve.moveDevicePos1(self.selve_device)
+        await self._async_send_command(self.selve.moveDevicePos1, mask_command=DriveCommandCommeo.DRIVEPOS1)
 
     async def async_close_cover(self, **kwargs):
         """Close the cover."""
         if self.isGroup:
-            await self.selve.moveGroupDown(self.selve_device)
+            await self._async_send_command(self.selve.moveGroupDown)
+            return
+        if self._estimator is not None:
+            await self._async_move_estimated(0)
             return
-        await self.selve.moveDeviceDown(self.selve_device)
+        await self._async_send_command(self.selve.moveDeviceDown, mask_command=DriveCommandCommeo.DRIVEDOWN)
 
     async def async_close_cover_tilt(self, **kwargs):
         """Close the cover."""
-        await self.selve.moveDevicePos2(self.selve_device)
+        await self._async_send_command(self.selve.moveDevicePos2, mask_command=DriveCommandCommeo.DRIVEPOS2)
 
     async def async_stop_cover(self, **kwargs):
         """Stop the cover."""
         if self.isGroup:
-            await self.selve.stopGroup(self.selve_device)
+            await self._async_send_command(self.selve.stopGroup, coalesce=False)
+            return
+        if self._estimator is not None:
+            await self._async_stop_estimated()
             return
-        await self.selve.stopDevice(self.selve_device)
+        await self._async_send_command(self.selve.stopDevice, coalesce=False, mask_command=DriveCommandCommeo.STOP)
 
     async def async_stop_cover_tilt(self, **kwargs):
         """Stop the cover."""
-        await self.selve.stopDevice(self.selve_device)
+        await self._async_send_command(self.selve.stopDevice, coalesce=False, mask_command=DriveCommandCommeo.STOP)
 
     async def async_set_cover_position(self, **kwargs):
         """Move the cover to a specific position."""
 
         if self.isCommeo:
             _current_cover_position = 100 - kwargs.get(ATTR_POSITION)
-            await self.selve.moveDevicePos(
-                self.selve_device, _current_cover_position
+            await self._async_send_command(
+                self.selve.moveDevicePos,
+                _current_cover_position,
+                mask_command=DriveCommandCommeo.DRIVEPOS,
+                mask_param=Util.percentageToValue(_current_cover_position),
             )
+        elif self._estimator is not None:
+            await self._async_move_estimated(kwargs.get(ATTR_POSITION))
         else:
             if kwargs.get(ATTR_POSITION) >= 50:
-                await self.selve.moveDeviceUp(self.selve_device)
+                await self._async_send_command(self.selve.moveDeviceUp)
             else:
-                await self.selve.moveDeviceDown(self.selve_device)
+                await self._async_send_command(self.selve.moveDeviceDown)
+
+    async def _async_move_estimated(self, position):
+        """Move a calibrated IVEO cover to a position, stopping it after the estimated travel time."""
+        estimator = self._estimator
+        self._cancel_estimate_timers()
+        current = estimator.position()
+        if round(current) == position and estimator.direction == 0:
+            return
+
+        if position > current:
+            await self._async_send_command(self.selve.moveDeviceUp)
+            estimator.start(OPENING)
+        else:
+            await self._async_send_command(self.selve.moveDeviceDown)
+            estimator.start(CLOSING)
+
+        # End positions are reached by the motor itself
+        if 0 < position < 100:
+            self._stop_unsub = async_call_later(
+                self.hass, estimator.time_to(position), self._async_stop_at_target
+            )
+        self._estimate_unsub = async_call_later(self.hass, ESTIMATE_INTERVAL, self._update_estimate)
+        self._handle_device_update()
+
+    async def _async_stop_at_target(self, _now):
+        self._stop_unsub = None
+        await self._async_stop_estimated()
+
+    async def _async_stop_estimated(self):
+        """Stop a calibrated IVEO cover and keep its estimated position."""
+        self._cancel_estimate_timers()
+        await self._async_send_command(self.selve.stopDevice, coalesce=False)
+        if (estimator := self._estimator) is not None:
+            self._store_estimate(estimator.stop())
+
+    @callback
+    def _update_estimate(self, _now):
+        """Write the estimated position while the cover is moving."""
+        self._estimate_unsub = None
+        estimator = self._estimator
+        if estimator is None:
+            return
+        if estimator.update():
+            self._estimate_unsub = async_call_later(self.hass, ESTIMATE_INTERVAL, self._update_estimate)
+            self._handle_device_update()
+        else:
+            self._store_estimate(estimator.position())
+
+    @callback
+    def _store_estimate(self, position):
+        """Keep the estimated position on the device, so it is cached across restarts."""
+        # The library sets fixed values after each IVEO command
+        value = 100 - round(position)
+        self.selve.setDeviceValue(self.selve_device.id, value, SelveTypes.IVEO)
+        self.selve.setDeviceTargetValue(self.selve_device.id, value, SelveTypes.IVEO)
+
+    def _cancel_estimate_timers(self):
+        for unsub in (self._estimate_unsub, self._stop_unsub):
+            if unsub is not None:
+                unsub()
+        self._estimate_unsub = self._stop_unsub = None
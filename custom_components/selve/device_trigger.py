@@ -0,0 +1,97 @@
+"""
+Device triggers for the button events of Selve senders.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.const import CONF_DEVICE_ID, CONF_DOMAIN, CONF_PLATFORM, CONF_TYPE
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+from selve import SelveTypes, senderEvents
+
+from .const import DOMAIN, SIGNAL_SENDER_EVENT
+from .event import SENDER_EVENT_TYPES
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {
+        vol.Required(CONF_TYPE): vol.In(SENDER_EVENT_TYPES),
+    }
+)
+
+
+def _sender(hass: HomeAssistant, device_id: str) -> tuple[str, int] | None:
+    """Return the config entry id and sender id of a sender device."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        return None
+    prefix = SelveTypes.SENDER.value
+    for domain, identifier in device.identifiers:
+        if domain == DOMAIN and identifier.startswith(prefix) and identifier[len(prefix):].isdigit():
+            sender_id = int(identifier[len(prefix):])
+            for entry_id in device.config_entries:
+                entry = hass.config_entries.async_get_entry(entry_id)
+                if entry is not None and entry.domain == DOMAIN:
+                    return entry_id, sender_id
+    return None
+
+
+async def async_get_triggers(hass: HomeAssistant, device_id: str) -> list[dict[str, Any]]:
+    """Return the button events of a sender device."""
+    if _sender(hass, device_id) is None:
+        return []
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: event_type,
+        }
+        for event_type in SENDER_EVENT_TYPES
+    ]
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Listen for a button event of a sender."""
+    device_id = config[CONF_DEVICE_ID]
+    event_type = config[CONF_TYPE]
+    sender = _sender(hass, device_id)
+    if sender is None:
+        raise vol.Invalid(f"Device {device_id} is not a Selve sender")
+    entry_id, sender_id = sender
+    job = HassJob(action)
+    trigger_data = trigger_info["trigger_data"]
+
+    @callback
+    def handle_sender_event(event: senderEvents) -> None:
+        if event.name.lower() != event_type:
+            return
+        hass.async_run_hass_job(
+            job,
+            {
+                "trigger": {
+                    **trigger_data,
+                    CONF_PLATFORM: "device",
+                    CONF_DOMAIN: DOMAIN,
+                    CONF_DEVICE_ID: device_id,
+                    CONF_TYPE: event_type,
+                    "sender_id": sender_id,
+                    "description": f"Selve sender {sender_id} {event_type}",
+                }
+            },
+        )
+
+    # The signal survives reloads of the config entry
+    return async_dispatcher_connect(hass, SIGNAL_SENDER_EVENT.format(entry_id, sender_id), handle_sender_event)
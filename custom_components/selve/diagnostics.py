@@ -0,0 +1,150 @@
+"""
+Diagnostics support for Selve.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+import logging
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PORT
+from homeassistant.core import HomeAssistant
+
+from selve import SelveTypes
+
+from .const import DOMAIN
+from .groups import group_member_ids
+
+_LOGGER = logging.getLogger(__name__)
+
+# RF addresses identify the devices of a household, the library spells them both ways
+TO_REDACT = {"rfAdress", "rfAddress", "netAddress"}
+
+TOPOLOGY_TYPES = (
+    SelveTypes.DEVICE,
+    SelveTypes.IVEO,
+    SelveTypes.GROUP,
+    SelveTypes.SENSOR,
+    SelveTypes.SENDER,
+    SelveTypes.SENSIM,
+)
+
+
+def _device_data(device) -> dict[str, Any]:
+    """Return the attributes of a device as plain values."""
+    data = {}
+    for name, value in vars(device).items():
+        if name == "mask" or name.startswith("_"):
+            continue
+        if isinstance(value, Enum):
+            value = value.name
+        elif not isinstance(value, (str, int, float, bool, type(None))):
+            value = str(value)
+        data[name] = value
+    return data
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, config_entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+    controller = gateway.controller
+
+    spec = None
+    if controller is not None and gateway.available:
+        try:
+            spec = await controller.getGatewaySpec() or None
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Error when reading the gateway spec", exc_info=True)
+
+    topology = {}
+    if controller is not None:
+        for device_type in TOPOLOGY_TYPES:
+            devices = controller.devices.get(device_type.value, {})
+            topology[device_type.value] = {
+                "count": len(devices),
+                "devices": [_device_data(device) for device in devices.values()],
+            }
+        for group in topology[SelveTypes.GROUP.value]["devices"]:
+            device = controller.devices[SelveTypes.GROUP.value][group["id"]]
+            group["members"] = group_member_ids(device.mask)
+
+    scheduler = gateway.scheduler
+    health = gateway.health
+
+    data = {
+        "entry": {
+            "data": dict(config_entry.data),
+            "options": dict(config_entry.options),
+        },
+        "gateway": {
+            "serial": gateway.gatewayId,
+            "firmware": gateway.gatewayFW,
+            "spec": spec,
+            "available": gateway.available,
+            "startup_refresh_time": gateway.startup_refresh_time,
+        },
+        "topology": topology,
+        "events": {
+            "received": dict(gateway.event_counts),
+            "dropped": dict(gateway.dropped_event_counts),
+        },
+        "updates": {
+            "device_update_count": gateway.device_update_count,
+            "state_write_count": gateway.state_write_count,
+            "skipped_write_count": gateway.skipped_write_count,
+            "coalesced_update_count": gateway.coalesced_update_count,
+            "writes_per_update": round(gateway.writes_per_update, 3),
+            "device_listeners": sum(len(listeners) for listeners in gateway._device_listeners.values()),
+        },
+        "scheduler": {
+            "queue_depth": scheduler.queue_depth,
+            "max_queue_depth": scheduler.max_queue_depth,
+            "sent_count": scheduler.sent_count,
+            "transmission_count": scheduler.transmission_count,
+            "failed_count": scheduler.failed_count,
+            "blocked_count": scheduler.blocked_count,
+            "coalesced_count": scheduler.coalesced_count,
+            "batched_count": scheduler.batched_count,
+            "last_wait": round(scheduler.last_wait, 3),
+            "average_wait": round(scheduler.average_wait, 3),
+            "max_wait": round(scheduler.max_wait, 3),
+            "blocked": scheduler.blocked,
+            "traffic": scheduler.traffic,
+            "pacing_interval": scheduler.pacing_interval,
+        },
+        "health": {
+            "available": health.available,
+            "check_count": health.check_count,
+            "failure_count": health.failure_count,
+            "consecutive_failures": health.consecutive_failures,
+            "skipped_check_count": health.skipped_check_count,
+            "ping_latency": health.latency.as_dict(),
+        },
+        "telemetry": {
+            "values": {
+                key: [str(item) for item in value] if isinstance(value, tuple) else str(value)
+                for key, value in gateway.telemetry.values.items()
+            },
+            "intervals": gateway.telemetry.intervals,
+            "poll_count": gateway.telemetry.poll_count,
+            "failed_count": gateway.telemetry.failed_count,
+            "deferred_count": gateway.telemetry.deferred_count,
+            "recorded_count": gateway.telemetry.recorded_count,
+        },
+        "reconciler": {
+            "check_count": gateway.reconciler.check_count,
+            "moving_count": gateway.reconciler.moving_count,
+            "off_target_count": gateway.reconciler.off_target_count,
+            "refresh_count": gateway.reconciler.refresh_count,
+            "failed_count": gateway.reconciler.failed_count,
+            "deferred_count": gateway.reconciler.deferred_count,
+        },
+        "calls": {
+            name: stats.as_dict()
+            for name, stats in sorted(controller.call_stats.items())
+        } if controller is not None else {},
+    }
+    return async_redact_data(data, TO_REDACT)
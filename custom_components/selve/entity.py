@@ -0,0 +1,58 @@
+"""
+Base entity for Selve devices.
+"""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+
+
+class SelveEntity(Entity):
+    """Entity representing a single device known to the gateway.
+
+    The entity is only woken up when its own device has been updated, and only
+    writes its state when the values it reports have changed. It is available
+    while the gateway's health monitor considers the gateway to be answering.
+    """
+
+    def __init__(self, device, device_type, gateway) -> None:
+        self.selve_device = device
+        self.device_type = device_type
+        self.gateway = gateway
+        self.selve = gateway.controller
+        self._snapshot = self._state_snapshot()
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._snapshot = self._state_snapshot()
+        self.async_on_remove(
+            self.gateway.async_add_device_listener(
+                self.device_type, self.selve_device.id, self._handle_device_update
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self.gateway.availability_signal, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the gateway is answering."""
+        return self.gateway.available
+
+    def _state_snapshot(self):
+        """Return the device values this entity writes to its state."""
+        raise NotImplementedError
+
+    @callback
+    def _handle_device_update(self) -> bool:
+        """Write the state if it has changed. Returns True if it was written."""
+        snapshot = self._state_snapshot()
+        if snapshot == self._snapshot:
+            return False
+        self._snapshot = snapshot
+        self.async_write_ha_state()
+        return True
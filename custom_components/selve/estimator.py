@@ -0,0 +1,71 @@
+"""
+Position estimation for covers without return channel.
+"""
+
+from __future__ import annotations
+
+import time
+
+OPENING = 1
+CLOSING = -1
+STOPPED = 0
+
+
+class PositionEstimator:
+    """Estimates the position of a cover from the time it has been moving.
+
+    Positions are Home Assistant cover positions, 0 is closed and 100 is fully
+    open. `travel_time_up` and `travel_time_down` are the seconds the cover
+    needs for a full travel in each direction.
+    """
+
+    def __init__(self, travel_time_up: float, travel_time_down: float, position: float = 0.0) -> None:
+        self.travel_time_up = travel_time_up
+        self.travel_time_down = travel_time_down
+        self.direction = STOPPED
+        self._position = position
+        self._started = 0.0
+
+    def position(self, now: float | None = None) -> float:
+        """Return the estimated position."""
+        if self.direction == STOPPED:
+            return self._position
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self._started
+        if self.direction == OPENING:
+            return min(100.0, self._position + elapsed * 100 / self.travel_time_up)
+        return max(0.0, self._position - elapsed * 100 / self.travel_time_down)
+
+    def start(self, direction: int, now: float | None = None) -> None:
+        """Start estimating a movement in `direction`."""
+        if now is None:
+            now = time.monotonic()
+        self._position = self.position(now)
+        self.direction = direction
+        self._started = now
+
+    def stop(self, now: float | None = None) -> float:
+        """Stop the movement and return the position it stopped at."""
+        self._position = self.position(now)
+        self.direction = STOPPED
+        return self._position
+
+    def update(self, now: float | None = None) -> bool:
+        """Stop the movement once an end position is reached. Returns True while still moving."""
+        if self.direction == STOPPED:
+            return False
+        position = self.position(now)
+        if (self.direction == OPENING and position >= 100) or (self.direction == CLOSING and position <= 0):
+            self.stop(now)
+            return False
+        return True
+
+    def time_to(self, target: float, now: float | None = None) -> float:
+        """Return the seconds the current movement needs to reach `target`."""
+        position = self.position(now)
+        if self.direction == OPENING:
+            return max(0.0, (target - position) * self.travel_time_up / 100)
+        if self.direction == CLOSING:
+            return max(0.0, (position - target) * self.travel_time_down / 100)
+        return 0.0
@@ -0,0 +1,89 @@
+"""
+Support for Selve senders (wall switches and hand transmitters) as event entities.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.components.event import EventEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PORT
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from selve import SelveTypes, senderEvents
+
+from .const import DOMAIN, SIGNAL_SENDER_EVENT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Event types of a sender entity, one per button event of the gateway
+SENDER_EVENT_TYPES = [event.name.lower() for event in senderEvents]
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info=None,
+):
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+
+    async_add_entities(
+        SelveSenderEvent(sender, gateway)
+        for sender in gateway.controller.devices[SelveTypes.SENDER.value].values()
+    )
+
+
+class SelveSenderEvent(EventEntity):
+    """The button events of a sender.
+
+    The gateway sends an event for each button press of a sender it has been
+    taught. The entity is connected to the dispatcher signal of its own
+    sender, so a press only reaches the entity and device triggers of that
+    sender.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = None
+    _attr_should_poll = False
+    _attr_event_types = SENDER_EVENT_TYPES
+
+    def __init__(self, sender, gateway) -> None:
+        self.selve_device = sender
+        self.gateway = gateway
+        self._attr_unique_id = f"{SelveTypes.SENDER.value}{sender.id}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, self._attr_unique_id)},
+            name=str(sender.name),
+            manufacturer="Selve",
+            model="Sender",
+            via_device=(DOMAIN, gateway.controller.gateway_id),
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_SENDER_EVENT.format(self.gateway.config_entry.entry_id, self.selve_device.id),
+                self._handle_sender_event,
+            )
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self.gateway.availability_signal, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the gateway is answering."""
+        return self.gateway.available
+
+    @callback
+    def _handle_sender_event(self, event: senderEvents) -> None:
+        self._trigger_event(event.name.lower())
+        self.async_write_ha_state()
@@ -0,0 +1,156 @@
+"""
+Aggregated positions of the gateway's groups.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+
+from selve import Util
+
+from .estimator import CLOSING, OPENING, STOPPED
+
+
+def group_member_ids(mask) -> list[int]:
+    """Return the ids of the devices in a group mask."""
+    if not mask:
+        return []
+    return Util.true_in_list(Util.b64bytes_to_bitlist(mask))
+
+
+class GroupAggregate:
+    """Positions of the members of a group.
+
+    Positions are counted per percent, so adding or removing a member is done
+    in constant time, without looking at the other members.
+    """
+
+    __slots__ = ("_counts", "_total", "count", "min", "max", "opening", "closing")
+
+    def __init__(self) -> None:
+        self._counts = [0] * 101
+        self._total = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+        self.opening = 0
+        self.closing = 0
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean position of the members."""
+        return self._total / self.count if self.count else None
+
+    @property
+    def moving(self) -> bool:
+        """Return True if any member is moving."""
+        return bool(self.opening or self.closing)
+
+    @property
+    def closed(self) -> bool | None:
+        """Return True if all members are closed."""
+        return self.max == 0 if self.count else None
+
+    def snapshot(self) -> tuple:
+        """Return the aggregated values."""
+        mean = self.mean
+        return (self.min, self.max, None if mean is None else round(mean), self.opening, self.closing)
+
+    def add(self, position: int, direction: int) -> None:
+        """Add a member."""
+        self._counts[position] += 1
+        self._total += position
+        self.count += 1
+        if self.min is None or position < self.min:
+            self.min = position
+        if self.max is None or position > self.max:
+            self.max = position
+        if direction == OPENING:
+            self.opening += 1
+        elif direction == CLOSING:
+            self.closing += 1
+
+    def remove(self, position: int, direction: int) -> None:
+        """Remove a member that has been added before."""
+        counts = self._counts
+        counts[position] -= 1
+        self._total -= position
+        self.count -= 1
+        if direction == OPENING:
+            self.opening -= 1
+        elif direction == CLOSING:
+            self.closing -= 1
+        if not self.count:
+            self.min = self.max = None
+            return
+        # Scans at most the 101 possible positions, independent of the group size
+        if position == self.min and not counts[position]:
+            while not counts[self.min]:
+                self.min += 1
+        if position == self.max and not counts[position]:
+            while not counts[self.max]:
+                self.max -= 1
+
+
+class GroupIndex:
+    """Keeps the aggregated positions of all groups up to date.
+
+    A reverse index from device to groups means that an update of a device
+    only touches the groups it is a member of.
+    """
+
+    def __init__(self) -> None:
+        self._aggregates = {}
+        self._members = {}
+        self._device_groups = defaultdict(set)
+        # Position and direction each device contributes to its groups
+        self._devices = {}
+
+    def aggregate(self, group_id: int) -> GroupAggregate | None:
+        """Return the aggregated positions of a group."""
+        return self._aggregates.get(group_id)
+
+    def groups_of(self, device_id: int) -> set[int]:
+        """Return the ids of the groups a device is a member of."""
+        return self._device_groups.get(device_id, set())
+
+    def set_group(self, group_id: int, member_ids) -> None:
+        """Set the members of a group."""
+        self.remove_group(group_id)
+        members = set(member_ids)
+        aggregate = GroupAggregate()
+        for device_id in members:
+            self._device_groups[device_id].add(group_id)
+            if device_id in self._devices:
+                aggregate.add(*self._devices[device_id])
+        self._members[group_id] = members
+        self._aggregates[group_id] = aggregate
+
+    def remove_group(self, group_id: int) -> None:
+        """Remove a group."""
+        for device_id in self._members.pop(group_id, ()):
+            groups = self._device_groups[device_id]
+            groups.discard(group_id)
+            if not groups:
+                del self._device_groups[device_id]
+        self._aggregates.pop(group_id, None)
+
+    def update_device(self, device_id: int, position: int, direction: int = STOPPED) -> list[int]:
+        """Apply the position of a device. Returns the ids of the groups whose aggregate changed."""
+        position = max(0, min(100, int(position)))
+        new = (position, direction)
+        old = self._devices.get(device_id)
+        if old == new:
+            return []
+        self._devices[device_id] = new
+
+        changed = []
+        for group_id in self._device_groups.get(device_id, ()):
+            aggregate = self._aggregates[group_id]
+            before = aggregate.snapshot()
+            if old is not None:
+                aggregate.remove(*old)
+            aggregate.add(*new)
+            if aggregate.snapshot() != before:
+                changed.append(group_id)
+        return changed
@@ -0,0 +1,144 @@
+"""
+Health monitoring of a gateway.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+from .stats import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds without traffic from the gateway after which it is pinged
+IDLE_INTERVAL = 15.0
+# Seconds between checks while the gateway is failing
+RETRY_INTERVAL = 2.0
+# Seconds to wait for the answer to a ping
+PING_TIMEOUT = 5.0
+# Consecutive failed checks after which the gateway is unavailable
+FAILURE_THRESHOLD = 2
+# Number of pings in the rolling latency histogram
+LATENCY_WINDOW = 100
+
+
+class HealthMonitor:
+    """Checks in the background whether the gateway still answers.
+
+    The gateway is only pinged if nothing has been received from it for a
+    while, so it costs nothing while events and answers to requests are coming
+    in. Device updates made locally, e.g. when a command is queued, do not
+    count, as they do not show that the gateway is answering. After a
+    failed ping it is checked again within seconds, and it becomes unavailable
+    after `FAILURE_THRESHOLD` failures in a row. Any traffic from the gateway
+    makes it available again.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ping: Callable[[], Awaitable[bool]],
+        availability_changed: Callable[[bool], None],
+    ) -> None:
+        self._hass = hass
+        self._ping = ping
+        self._availability_changed = availability_changed
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._last_activity = time.monotonic()
+
+        self.available = True
+        self.latency = LatencyHistogram(window=LATENCY_WINDOW)
+        self.check_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.skipped_check_count = 0
+
+    @property
+    def interval(self) -> float:
+        """Return the seconds until the next check."""
+        return RETRY_INTERVAL if self.consecutive_failures else IDLE_INTERVAL
+
+    @callback
+    def record_activity(self) -> None:
+        """Note that something has been received from the gateway."""
+        self._last_activity = time.monotonic()
+        if not self.available:
+            self.consecutive_failures = 0
+            self._set_available(True)
+
+    @callback
+    def request_check(self) -> None:
+        """Check the gateway now, e.g. after a request has timed out."""
+        self._wakeup.set()
+
+    def start(self, config_entry: ConfigEntry) -> None:
+        """Start checking the gateway."""
+        self._task = config_entry.async_create_background_task(
+            self._hass, self._async_run(), "selve health monitor"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop checking the gateway."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def async_check(self) -> bool:
+        """Ping the gateway and apply the result. Returns True if it answered."""
+        self.check_count += 1
+        start = time.monotonic()
+        try:
+            answered = bool(await asyncio.wait_for(self._ping(), PING_TIMEOUT))
+        except asyncio.TimeoutError:
+            answered = False
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Error when pinging the gateway", exc_info=True)
+            answered = False
+
+        if answered:
+            self.latency.record(time.monotonic() - start)
+            self.consecutive_failures = 0
+            self._last_activity = time.monotonic()
+            if not self.available:
+                self._set_available(True)
+            return True
+
+        self.failure_count += 1
+        self.consecutive_failures += 1
+        if self.available and self.consecutive_failures >= FAILURE_THRESHOLD:
+            self._set_available(False)
+        return False
+
+    async def _async_run(self) -> None:
+        while True:
+            requested = False
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+                requested = True
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if (
+                not requested
+                and not self.consecutive_failures
+                and time.monotonic() - self._last_activity < IDLE_INTERVAL
+            ):
+                self.skipped_check_count += 1
+                continue
+            await self.async_check()
+
+    def _set_available(self, available: bool) -> None:
+        self.available = available
+        if available:
+            _LOGGER.info("Gateway is answering again")
+        else:
+            _LOGGER.warning("Gateway is not answering, marking its entities unavailable")
+        self._availability_changed(available)
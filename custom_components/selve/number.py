@@ -0,0 +1,130 @@
+"""
+Support for the analog values of Selve SenSims (sensor simulators) as number entities.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import logging
+
+from homeassistant.components.number import (
+    NumberDeviceClass,
+    NumberEntity,
+    NumberEntityDescription,
+    NumberMode,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PORT, LIGHT_LUX, UnitOfSpeed, UnitOfTemperature
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from selve import SelveTypes
+
+from .const import DOMAIN
+from .entity import SelveEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SelveSenSimNumberEntityDescription(NumberEntityDescription):
+    """Describes an analog value of a SenSim."""
+
+    attribute: str
+
+
+def _light(key: str, name: str, attribute: str, enabled: bool = True) -> SelveSenSimNumberEntityDescription:
+    return SelveSenSimNumberEntityDescription(
+        key=key,
+        name=name,
+        attribute=attribute,
+        device_class=NumberDeviceClass.ILLUMINANCE,
+        native_unit_of_measurement=LIGHT_LUX,
+        native_min_value=0,
+        native_max_value=65535,
+        entity_registry_enabled_default=enabled,
+    )
+
+
+SENSIM_NUMBER_TYPES: tuple[SelveSenSimNumberEntityDescription, ...] = (
+    SelveSenSimNumberEntityDescription(
+        key="temperature",
+        name="Temperature",
+        attribute="tempAnalog",
+        device_class=NumberDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        native_min_value=-40,
+        native_max_value=80,
+    ),
+    SelveSenSimNumberEntityDescription(
+        key="wind_speed",
+        name="Wind speed",
+        attribute="windAnalog",
+        device_class=NumberDeviceClass.WIND_SPEED,
+        native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+        native_min_value=0,
+        native_max_value=255,
+    ),
+    _light("daylight", "Daylight", "dayLightAnalog"),
+    _light("sun_1", "Sun 1", "sun1Analog"),
+    _light("sun_2", "Sun 2", "sun2Analog", enabled=False),
+    _light("sun_3", "Sun 3", "sun3Analog", enabled=False),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info=None,
+):
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+
+    async_add_entities(
+        SelveSenSimNumber(sensim, gateway, description)
+        for sensim in gateway.controller.devices[SelveTypes.SENSIM.value].values()
+        for description in SENSIM_NUMBER_TYPES
+    )
+
+
+class SelveSenSimNumber(SelveEntity, NumberEntity):
+    """An analog value of a SenSim.
+
+    The value is read from the SenSim cached by the gateway, which is read once
+    at startup and updated by every successful write. Values set on several
+    entities of the same SenSim at once are sent in one request.
+    """
+
+    entity_description: SelveSenSimNumberEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_mode = NumberMode.BOX
+    _attr_native_step = 1
+
+    def __init__(self, device, gateway, description: SelveSenSimNumberEntityDescription) -> None:
+        self.entity_description = description
+        super().__init__(device, SelveTypes.SENSIM, gateway)
+        self._attr_unique_id = f"{SelveTypes.SENSIM.value}{device.id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{SelveTypes.SENSIM.value}{device.id}")},
+            name=str(device.name),
+            manufacturer="Selve",
+            model="SenSim",
+            via_device=(DOMAIN, gateway.controller.gateway_id),
+        )
+
+    def _state_snapshot(self):
+        return getattr(self.selve_device, self.entity_description.attribute, None)
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the cached value."""
+        return self._snapshot
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Write the value to the SenSim."""
+        if not await self.gateway.async_set_sensim_values(
+            self.selve_device.id, {self.entity_description.attribute: value}
+        ):
+            raise HomeAssistantError(f"The gateway did not accept the value for {self.entity_id}")
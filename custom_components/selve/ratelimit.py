@@ -0,0 +1,29 @@
+"""
+Rate limiting helpers.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` operations per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self._last = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def consume(self, tokens: float = 1.0) -> bool:
+        """Take tokens from the bucket. Returns False if not enough tokens are left."""
+        self._refill(time.monotonic())
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        return True
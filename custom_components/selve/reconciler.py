@@ -0,0 +1,155 @@
+"""
+Detection of missed Commeo device events.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from selve import MovementState
+
+from .ratelimit import TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between two checks of all devices
+CHECK_INTERVAL = 10.0
+# Seconds a Commeo cover is assumed to need for a full travel
+FULL_TRAVEL_TIME = 60.0
+# Seconds added to the expected travel time before a moving device is refreshed
+MOVE_GRACE = 15.0
+# Seconds after its last update before a stopped device not at its target is refreshed
+SETTLE_TIME = 30.0
+# Refreshes per second for all devices of a gateway, and the largest burst
+REFRESH_RATE = 0.2
+REFRESH_BURST = 10
+
+MOVING_STATES = (MovementState.UP_ON, MovementState.DOWN_ON)
+
+
+def expected_travel_time(device) -> float:
+    """Return the seconds a moving device may go without an event before its final one has been missed."""
+    value = device.value or 0
+    target = device.targetValue
+    if target is None or target == value:
+        # The end of travel in the direction of the movement, 0 is open
+        target = 0 if device.state == MovementState.UP_ON else 100
+    return FULL_TRAVEL_TIME * abs(target - value) / 100 + MOVE_GRACE
+
+
+def _values(device) -> tuple:
+    return device.state, device.value, device.targetValue
+
+
+class DeviceReconciler:
+    """Refreshes Commeo devices whose final event has probably been lost.
+
+    Covers are only updated by the events the gateway pushes, so an event lost
+    to an RF collision or a USB hiccup leaves a cover wrong until it moves
+    again. A device is refreshed if it has been moving without an event for
+    longer than its remaining travel should take, or if it has stopped away
+    from its target value. Devices whose values are unchanged since their
+    last refresh are not refreshed again, and all refreshes share a budget of
+    `REFRESH_RATE` per second, so a gateway that has lost many events is not
+    flooded with requests.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        devices: Callable[[], dict],
+        updated_at: dict[int, float],
+        refresh: Callable[[int], Awaitable[bool]],
+        available: Callable[[], bool],
+    ) -> None:
+        self._hass = hass
+        self._devices = devices
+        self._updated_at = updated_at
+        self._refresh = refresh
+        self._available = available
+        self._task = None
+        self._budget = TokenBucket(REFRESH_RATE, REFRESH_BURST)
+        # Device values as confirmed by the last refresh, per device id
+        self._confirmed = {}
+
+        self.check_count = 0
+        self.moving_count = 0
+        self.off_target_count = 0
+        self.refresh_count = 0
+        self.failed_count = 0
+        self.deferred_count = 0
+
+    def start(self, config_entry: ConfigEntry) -> None:
+        """Start checking the devices."""
+        self._task = config_entry.async_create_background_task(
+            self._hass, self._async_run(), "selve device reconciler"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop checking the devices."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def suspects(self, now: float | None = None) -> list[tuple[int, bool]]:
+        """Return the devices that have probably missed an event, longest without update first.
+
+        Each is returned as its id and whether it is still marked as moving.
+        """
+        now = time.monotonic() if now is None else now
+        found = []
+        for device in self._devices().values():
+            updated_at = self._updated_at.get(device.id)
+            if updated_at is None or self._confirmed.get(device.id) == _values(device):
+                continue
+            idle = now - updated_at
+            if device.state in MOVING_STATES:
+                if idle > expected_travel_time(device):
+                    found.append((idle, device.id, True))
+            elif device.targetValue is not None and device.targetValue != device.value and idle > SETTLE_TIME:
+                found.append((idle, device.id, False))
+        found.sort(reverse=True)
+        return [(id, moving) for _, id, moving in found]
+
+    async def async_check(self) -> int:
+        """Refresh the devices that have probably missed an event, within the budget. Returns the number refreshed."""
+        self.check_count += 1
+        refresh = []
+        for id, moving in self.suspects():
+            if not self._budget.consume():
+                self.deferred_count += 1
+                continue
+            if moving:
+                self.moving_count += 1
+            else:
+                self.off_target_count += 1
+            refresh.append(id)
+        if not refresh:
+            return 0
+
+        _LOGGER.debug("Refreshing devices %s, their last events may have been lost", refresh)
+        results = await asyncio.gather(*(self._refresh(id) for id in refresh))
+        for id, refreshed in zip(refresh, results):
+            if not refreshed:
+                self.failed_count += 1
+                continue
+            self.refresh_count += 1
+            device = self._devices().get(id)
+            if device is not None:
+                self._confirmed[id] = _values(device)
+        return len(refresh)
+
+    async def _async_run(self) -> None:
+        while True:
+            await asyncio.sleep(CHECK_INTERVAL)
+            if not self._available():
+                continue
+            try:
+                await self.async_check()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error when checking the devices for missed events")
@@ -0,0 +1,271 @@
+"""
+Scheduler for the RF commands sent through a gateway.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Awaitable, Callable, Hashable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# Minimum pause between two commands in seconds. The library waits 0.1 s after
+# each write, and movement commands are followed by a value request. Without it
+# bursts would pile up in the library's queue where they cannot be coalesced.
+MIN_COMMAND_INTERVAL = 0.2
+# RF traffic in percent of the duty cycle budget above which commands are spaced out
+PACING_THRESHOLD = 50
+# Pause between two commands at 100 % RF traffic, in seconds
+MAX_PACING_INTERVAL = 5.0
+# Time in seconds batchable commands wait for others with the same action and target
+BATCH_WINDOW = 0.1
+# Interval in seconds in which the duty cycle is polled while sending is blocked
+BLOCKED_POLL_INTERVAL = 10.0
+# Age in seconds after which the duty cycle is polled before sending
+DUTY_MAX_AGE = 60.0
+
+
+class _Command:
+    """A queued command and the future of its callers."""
+
+    __slots__ = ("command", "args", "key", "coalesce", "batch", "future", "enqueued")
+
+    def __init__(self, command, args, key, coalesce, batch, future, enqueued) -> None:
+        self.command = command
+        self.args = args
+        self.key = key
+        self.coalesce = coalesce
+        self.batch = batch
+        self.future = future
+        self.enqueued = enqueued
+
+
+class CommandScheduler:
+    """Sends RF commands one at a time, paced by the gateway's duty cycle.
+
+    The gateway may only use a limited share of the 868 MHz band and drops
+    commands once this budget is exhausted. The budget is tracked from the
+    duty cycle events and `getDuty`: commands are spaced out as the RF traffic
+    rises and held back while sending is blocked.
+
+    Commands for the same device replace each other while they are queued, so
+    only the newest one is sent. Commands that must not be dropped, like stop,
+    are never replaced. Commands for different devices with the same action and
+    target arriving within a short window are sent in a single transmission.
+    """
+
+    def __init__(self, hass: HomeAssistant, get_duty: Callable[[], Awaitable[bool]]) -> None:
+        self._hass = hass
+        self._get_duty = get_duty
+        self._queue = deque()
+        # Last queued command per device key
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._unblocked = asyncio.Event()
+        self._unblocked.set()
+        self._task = None
+
+        # Last known duty cycle
+        self.blocked = False
+        self.traffic = 0
+        self._duty_updated = None
+
+        self.sent_count = 0
+        self.transmission_count = 0
+        self.failed_count = 0
+        self.blocked_count = 0
+        self.coalesced_count = 0
+        self.batched_count = 0
+        self.max_queue_depth = 0
+        self.last_wait = 0.0
+        self.max_wait = 0.0
+        self._total_wait = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return len(self._queue)
+
+    @property
+    def average_wait(self) -> float:
+        """Return the average time in seconds commands have waited in the queue."""
+        sent = self.sent_count + self.failed_count
+        return self._total_wait / sent if sent else 0.0
+
+    @property
+    def pacing_interval(self) -> float:
+        """Return the pause in seconds between two commands at the current RF traffic."""
+        if self.traffic <= PACING_THRESHOLD:
+            return MIN_COMMAND_INTERVAL
+        load = min(self.traffic - PACING_THRESHOLD, 100 - PACING_THRESHOLD)
+        return max(MIN_COMMAND_INTERVAL, MAX_PACING_INTERVAL * load / (100 - PACING_THRESHOLD))
+
+    @callback
+    def update_duty(self, blocked: bool, traffic: int) -> None:
+        """Apply a duty cycle reported by the gateway."""
+        if blocked and not self.blocked:
+            self.blocked_count += 1
+            _LOGGER.warning("RF duty cycle limit reached, holding back commands")
+        elif self.blocked and not blocked:
+            _LOGGER.info("RF duty cycle limit released, resuming commands")
+        self.blocked = blocked
+        self.traffic = traffic
+        self._duty_updated = time.monotonic()
+        if blocked:
+            self._unblocked.clear()
+        else:
+            self._unblocked.set()
+
+    def start(self, config_entry: ConfigEntry) -> None:
+        """Start sending queued commands."""
+        self._task = config_entry.async_create_background_task(
+            self._hass, self._async_run(), "selve command scheduler"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop sending and cancel the queued commands."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        while self._queue:
+            self._queue.popleft().future.cancel()
+        self._pending.clear()
+
+    async def async_send(
+        self,
+        command: Callable[..., Awaitable],
+        *args,
+        key: Hashable | None = None,
+        coalesce: bool = True,
+        batch: tuple | None = None,
+    ):
+        """Queue a command and wait until it has been sent. Returns the command's result.
+
+        If `key` is given and the last queued command for the same key can be
+        coalesced, it is replaced by this command and both callers get the
+        result of this command. Commands queued with `coalesce=False` are
+        always sent.
+
+        `batch` is a tuple `(batch_command, *batch_args)`. Keyed commands queued
+        within the batch window with an equal `batch` are sent together as
+        `batch_command(devices, *batch_args)`, with the first argument of each
+        command as the device.
+        """
+        item = self._pending.get(key) if key is not None else None
+        if item is not None and item.coalesce and coalesce:
+            item.command = command
+            item.args = args
+            item.batch = batch
+            self.coalesced_count += 1
+        else:
+            item = _Command(command, args, key, coalesce, batch, self._hass.loop.create_future(), time.monotonic())
+            self._queue.append(item)
+            if key is not None:
+                self._pending[key] = item
+            self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+            self._wakeup.set()
+        # The command is sent even if a caller is cancelled, other callers may wait for it
+        return await asyncio.shield(item.future)
+
+    async def _async_run(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            await self._async_wait_for_duty()
+
+            item = self._queue.popleft()
+            if item.key is not None and self._pending.get(item.key) is item:
+                del self._pending[item.key]
+            if item.future.cancelled():
+                continue
+
+            items = [item]
+            if item.batch is not None and item.key is not None:
+                delay = item.enqueued + BATCH_WINDOW - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                items.extend(self._take_batch(item))
+
+            now = time.monotonic()
+            for queued in items:
+                wait = now - queued.enqueued
+                self.last_wait = wait
+                self.max_wait = max(self.max_wait, wait)
+                self._total_wait += wait
+
+            try:
+                if len(items) > 1:
+                    batch_command, *batch_args = item.batch
+                    result = await batch_command([queued.args[0] for queued in items], *batch_args)
+                    self.batched_count += len(items)
+                else:
+                    result = await item.command(*item.args)
+            except Exception as err:  # pylint: disable=broad-except
+                self.failed_count += len(items)
+                for queued in items:
+                    if not queued.future.done():
+                        queued.future.set_exception(err)
+            else:
+                self.sent_count += len(items)
+                self.transmission_count += 1
+                for queued in items:
+                    if not queued.future.done():
+                        queued.future.set_result(result)
+
+            await asyncio.sleep(self.pacing_interval)
+
+    def _take_batch(self, item: _Command) -> list[_Command]:
+        """Remove the queued commands that can be sent together with `item`."""
+        batch = []
+        keys = {item.key}
+        # Devices with an earlier queued command that is not part of the batch
+        blocked = set()
+        remaining = deque()
+        for queued in self._queue:
+            if (
+                queued.batch == item.batch
+                and queued.key is not None
+                and queued.key not in keys
+                and queued.key not in blocked
+                and not queued.future.cancelled()
+            ):
+                batch.append(queued)
+                keys.add(queued.key)
+                if self._pending.get(queued.key) is queued:
+                    del self._pending[queued.key]
+            else:
+                remaining.append(queued)
+                blocked.add(queued.key)
+        self._queue = remaining
+        return batch
+
+    async def _async_wait_for_duty(self) -> None:
+        """Wait until the gateway may send again."""
+        if self._duty_updated is None or time.monotonic() - self._duty_updated > DUTY_MAX_AGE:
+            await self._async_poll_duty()
+
+        while self.blocked:
+            try:
+                await asyncio.wait_for(self._unblocked.wait(), BLOCKED_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                # The duty cycle event may have been missed or be disabled
+                await self._async_poll_duty()
+
+    async def _async_poll_duty(self) -> None:
+        try:
+            if await self._get_duty():
+                return
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Error when reading the duty cycle", exc_info=True)
+        _LOGGER.debug("Could not read the duty cycle from the gateway")
+        # Do not poll again for every command
+        self._duty_updated = time.monotonic()
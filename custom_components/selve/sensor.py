@@ -0,0 +1,429 @@
+"""
+Support for Selve sensors.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import timedelta
+from enum import Enum
+import logging
+from typing import Callable
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    CONF_PORT,
+    LIGHT_LUX,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfSpeed,
+    UnitOfTemperature,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from selve import DutyMode, Forwarding, LEDMode, SelveTypes, SensorState, lightDigital, rainDigital, tempDigital, windDigital
+
+from .const import DOMAIN
+from .controller import ROUND_TRIP_METHOD
+from .entity import SelveEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+# Gateway statistics are only kept in memory, reading them is cheap
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+def _round_trip_percentile(percent: float) -> Callable:
+    """Return a function reading a percentile of the serial round trip latency in ms."""
+
+    def value(gateway) -> StateType:
+        stats = gateway.controller.call_stats.get(ROUND_TRIP_METHOD)
+        if stats is None or (seconds := stats.latency.percentile(percent)) is None:
+            return None
+        return round(seconds * 1000, 1)
+
+    return value
+
+
+@dataclass(frozen=True, kw_only=True)
+class SelveGatewaySensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reporting statistics of the gateway."""
+
+    value_fn: Callable[..., StateType]
+
+
+GATEWAY_SENSOR_TYPES: tuple[SelveGatewaySensorEntityDescription, ...] = (
+    SelveGatewaySensorEntityDescription(
+        key="round_trip_p50",
+        name="Serial round trip p50",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=_round_trip_percentile(50),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="round_trip_p95",
+        name="Serial round trip p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_round_trip_percentile(95),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="round_trip_p99",
+        name="Serial round trip p99",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=_round_trip_percentile(99),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="controller_calls",
+        name="Controller calls",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda gateway: sum(stats.count for stats in gateway.controller.call_stats.values()),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="controller_errors",
+        name="Controller errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda gateway: sum(stats.errors for stats in gateway.controller.call_stats.values()),
+    ),
+)
+
+
+def _telemetry(key: str, index: int | None = None) -> Callable:
+    """Return a function reading a telemetry value of the gateway, enums by their lowercase name."""
+
+    def value(gateway) -> StateType:
+        value = gateway.telemetry.values.get(key)
+        if value is not None and index is not None:
+            value = value[index]
+        return value.name.lower() if isinstance(value, Enum) else value
+
+    return value
+
+
+# Values polled from the gateway on an adaptive schedule or pushed by it, see TelemetryPoller
+TELEMETRY_SENSOR_TYPES: tuple[SelveGatewaySensorEntityDescription, ...] = (
+    SelveGatewaySensorEntityDescription(
+        key="temperature",
+        name="Temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_telemetry("temperature"),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="duty_mode",
+        name="Duty mode",
+        device_class=SensorDeviceClass.ENUM,
+        options=[mode.name.lower() for mode in DutyMode],
+        value_fn=_telemetry("duty", 0),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="rf_traffic",
+        name="RF traffic",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_telemetry("duty", 1),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="led",
+        name="LED",
+        device_class=SensorDeviceClass.ENUM,
+        options=[mode.name.lower() for mode in LEDMode],
+        entity_registry_enabled_default=False,
+        value_fn=_telemetry("led"),
+    ),
+    SelveGatewaySensorEntityDescription(
+        key="forwarding",
+        name="Forwarding",
+        device_class=SensorDeviceClass.ENUM,
+        options=[mode.name.lower() for mode in Forwarding],
+        entity_registry_enabled_default=False,
+        value_fn=_telemetry("forwarding"),
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class SelveWeatherSensorEntityDescription(SensorEntityDescription):
+    """Describes a value reported by a Selve sensor (weather station).
+
+    A new value of a numeric sensor is only written if it differs from the
+    written one by at least `deadband`, or by `relative_deadband` times the
+    written value if that is larger. The analog values are integers, so a
+    deadband of 2 is needed to filter jitter of one unit.
+    """
+
+    attribute: str
+    deadband: float = 0
+    relative_deadband: float = 0
+    # Unavailable while the sensor reports invalid values or a communication loss
+    requires_valid: bool = True
+
+
+def _enum_options(enum: type[Enum]) -> list[str]:
+    return [member.name.lower() for member in enum]
+
+
+WEATHER_SENSOR_TYPES: tuple[SelveWeatherSensorEntityDescription, ...] = (
+    SelveWeatherSensorEntityDescription(
+        key="temperature",
+        name="Temperature",
+        attribute="tempAnalog",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        native_unit_of_measurement=UnitOfTemperature.CELSIUS,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=2,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="wind_speed",
+        name="Wind speed",
+        attribute="windAnalog",
+        device_class=SensorDeviceClass.WIND_SPEED,
+        native_unit_of_measurement=UnitOfSpeed.METERS_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=2,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="daylight",
+        name="Daylight",
+        attribute="dayLightAnalog",
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        native_unit_of_measurement=LIGHT_LUX,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=2,
+        relative_deadband=0.05,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="sun_1",
+        name="Sun 1",
+        attribute="sun1Analog",
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        native_unit_of_measurement=LIGHT_LUX,
+        state_class=SensorStateClass.MEASUREMENT,
+        deadband=2,
+        relative_deadband=0.05,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="sun_2",
+        name="Sun 2",
+        attribute="sun2Analog",
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        native_unit_of_measurement=LIGHT_LUX,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        deadband=2,
+        relative_deadband=0.05,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="sun_3",
+        name="Sun 3",
+        attribute="sun3Analog",
+        device_class=SensorDeviceClass.ILLUMINANCE,
+        native_unit_of_measurement=LIGHT_LUX,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        deadband=2,
+        relative_deadband=0.05,
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="wind",
+        name="Wind",
+        attribute="windDigital",
+        device_class=SensorDeviceClass.ENUM,
+        options=_enum_options(windDigital),
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="rain",
+        name="Rain",
+        attribute="rainDigital",
+        device_class=SensorDeviceClass.ENUM,
+        options=_enum_options(rainDigital),
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="temperature_level",
+        name="Temperature level",
+        attribute="tempDigital",
+        device_class=SensorDeviceClass.ENUM,
+        options=_enum_options(tempDigital),
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="light_level",
+        name="Light level",
+        attribute="lightDigital",
+        device_class=SensorDeviceClass.ENUM,
+        options=_enum_options(lightDigital),
+    ),
+    SelveWeatherSensorEntityDescription(
+        key="sensor_state",
+        name="Sensor state",
+        attribute="sensorState",
+        device_class=SensorDeviceClass.ENUM,
+        options=_enum_options(SensorState),
+        entity_category=EntityCategory.DIAGNOSTIC,
+        requires_valid=False,
+    ),
+)
+
+# Digital values of a SenSim, the analog ones are number entities
+SENSIM_SENSOR_TYPES = tuple(
+    description for description in WEATHER_SENSOR_TYPES
+    if description.key in ("wind", "rain", "temperature_level", "light_level")
+)
+
+# Sensor states in which the values of a sensor are not valid
+UNAVAILABLE_SENSOR_STATES = (SensorState.INVALID, SensorState.COMMUNICATION_LOSS)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    discovery_info=None,
+):
+    gateway = hass.data[DOMAIN][config_entry.data[CONF_PORT]]
+
+    entities = [SelveGatewaySensor(gateway, description) for description in GATEWAY_SENSOR_TYPES]
+    entities.extend(SelveTelemetrySensor(gateway, description) for description in TELEMETRY_SENSOR_TYPES)
+    for sensor in gateway.controller.devices[SelveTypes.SENSOR.value].values():
+        for description in WEATHER_SENSOR_TYPES:
+            entities.append(SelveWeatherSensor(sensor, gateway, description))
+    for sensim in gateway.controller.devices[SelveTypes.SENSIM.value].values():
+        for description in SENSIM_SENSOR_TYPES:
+            entities.append(SelveSenSimSensor(sensim, gateway, description))
+    async_add_entities(entities)
+
+
+class SelveGatewaySensor(SensorEntity):
+    """Diagnostic sensor of a gateway, polled from the statistics kept in memory."""
+
+    entity_description: SelveGatewaySensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, gateway, description: SelveGatewaySensorEntityDescription) -> None:
+        self.gateway = gateway
+        self.entity_description = description
+        self._attr_unique_id = f"{gateway.gatewayId}_{description.key}"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, gateway.gatewayId)})
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value of the statistic."""
+        return self.entity_description.value_fn(self.gateway)
+
+
+class SelveTelemetrySensor(SelveGatewaySensor):
+    """Diagnostic sensor of a gateway, written when the telemetry poller has a new value."""
+
+    _attr_should_poll = False
+
+    async def async_added_to_hass(self) -> None:
+        """Run when this Entity has been added to HA."""
+        self._last_value = self.native_value
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.gateway.telemetry_signal, self._handle_telemetry_update)
+        )
+        self.async_on_remove(
+            async_dispatcher_connect(self.hass, self.gateway.availability_signal, self.async_write_ha_state)
+        )
+
+    @property
+    def available(self) -> bool:
+        """Return True if the gateway is answering."""
+        return self.gateway.available
+
+    @callback
+    def _handle_telemetry_update(self) -> None:
+        """Write the state if this sensor's value has changed."""
+        value = self.native_value
+        if value == self._last_value:
+            return
+        self._last_value = value
+        self.async_write_ha_state()
+
+
+class SelveWeatherSensor(SelveEntity, SensorEntity):
+    """A value of a Selve sensor, updated by the sensor events the gateway pushes.
+
+    Changes of numeric values within the deadband of the description are not
+    written, so jitter of the analog values does not cause state writes.
+    """
+
+    entity_description: SelveWeatherSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _device_type = SelveTypes.SENSOR
+    _model = "Sensor"
+    # Values are unknown until the sensor has been read or has sent an event
+    _values_known = False
+
+    def __init__(self, device, gateway, description: SelveWeatherSensorEntityDescription) -> None:
+        self.entity_description = description
+        self._has_values = self._values_known
+        super().__init__(device, self._device_type, gateway)
+        self._attr_unique_id = f"{self._device_type.value}{device.id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._device_type.value}{device.id}")},
+            name=str(device.name),
+            manufacturer="Selve",
+            model=self._model,
+            via_device=(DOMAIN, gateway.controller.gateway_id),
+        )
+
+    def _state_snapshot(self):
+        """Return the written value, or the new one if it is outside the deadband, and the sensor's validity."""
+        if not self._has_values:
+            return None
+        valid = (
+            not self.entity_description.requires_valid
+            or self.selve_device.sensorState not in UNAVAILABLE_SENSOR_STATES
+        )
+        value = getattr(self.selve_device, self.entity_description.attribute, None)
+        if isinstance(value, Enum):
+            return value.name.lower(), valid
+
+        snapshot = getattr(self, "_snapshot", None)
+        if snapshot is not None and snapshot[0] is not None and value is not None:
+            written = snapshot[0]
+            description = self.entity_description
+            if abs(value - written) < max(description.deadband, description.relative_deadband * abs(written)):
+                return written, valid
+        return value, valid
+
+    @callback
+    def _handle_device_update(self) -> bool:
+        self._has_values = True
+        return super()._handle_device_update()
+
+    @property
+    def available(self) -> bool:
+        """Return True if the gateway is answering and the sensor's values are valid."""
+        return super().available and (self._snapshot is None or self._snapshot[1])
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the last written value."""
+        return None if self._snapshot is None else self._snapshot[0]
+
+
+class SelveSenSimSensor(SelveWeatherSensor):
+    """A digital value of a SenSim, as last read from or written to the gateway."""
+
+    _device_type = SelveTypes.SENSIM
+    _model = "SenSim"
+    # The values are cached with the SenSim
+    _values_known = True
@@ -0,0 +1,217 @@
+"""
+Services of the Selve integration.
+
+The services are registered once for the domain. Each call is handled by the
+gateway selected with the `gateway` field, or by the gateway of the targeted
+entities or devices, so several gateways can be set up side by side.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.const import ATTR_DEVICE_ID, ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr, entity_registry as er
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from . import SelveGateway
+
+# Selects the gateway by its port, serial number or config entry id
+ATTR_GATEWAY = "gateway"
+ATTR_TARGETS = "targets"
+
+_OPTIONAL = SupportsResponse.OPTIONAL
+
+# Services and whether they return a response. Each is handled by the
+# SelveGateway method of the same name.
+SERVICES = {
+    # Gateway
+    "ping_gateway": _OPTIONAL,
+    "gateway_state": _OPTIONAL,
+    "get_gateway_firmware_version": _OPTIONAL,
+    "get_gateway_serial": _OPTIONAL,
+    "get_gateway_spec": _OPTIONAL,
+    "reset": _OPTIONAL,
+    "factory_reset_gateway": _OPTIONAL,
+    "set_led": _OPTIONAL,
+    "get_led": _OPTIONAL,
+    "update_all_devices": SupportsResponse.NONE,
+    "set_forward": _OPTIONAL,
+    "get_forward": _OPTIONAL,
+    "set_events": _OPTIONAL,
+    "get_events": _OPTIONAL,
+    "get_duty": _OPTIONAL,
+    "get_rf": _OPTIONAL,
+    "set_duty": _OPTIONAL,
+    "set_rf": _OPTIONAL,
+    "get_temperature": _OPTIONAL,
+    "get_stats": _OPTIONAL,
+    # Devices
+    "device_scan_start": _OPTIONAL,
+    "device_scan_stop": _OPTIONAL,
+    "device_scan_result": _OPTIONAL,
+    "device_save": _OPTIONAL,
+    "device_get_ids": _OPTIONAL,
+    "device_get_info": _OPTIONAL,
+    "device_get_values": _OPTIONAL,
+    "device_get_values_bulk": SupportsResponse.ONLY,
+    "device_set_function": _OPTIONAL,
+    "device_set_label": _OPTIONAL,
+    "device_set_type": _OPTIONAL,
+    "device_delete": _OPTIONAL,
+    "device_write_manual": _OPTIONAL,
+    "device_update_values": _OPTIONAL,
+    "device_set_value": _OPTIONAL,
+    "device_set_target_value": _OPTIONAL,
+    "device_set_state": _OPTIONAL,
+    "device_move_up": _OPTIONAL,
+    "device_move_down": _OPTIONAL,
+    "device_move_pos1": _OPTIONAL,
+    "device_move_pos2": _OPTIONAL,
+    "device_move_pos": _OPTIONAL,
+    "device_move_stop": _OPTIONAL,
+    "device_move_step_up": _OPTIONAL,
+    "device_move_step_down": _OPTIONAL,
+    "device_save_pos1": _OPTIONAL,
+    "device_save_pos2": _OPTIONAL,
+    "command_result": _OPTIONAL,
+    "move_many": _OPTIONAL,
+    # Group
+    "group_read": _OPTIONAL,
+    "group_write": _OPTIONAL,
+    "group_get_ids": _OPTIONAL,
+    "group_delete": _OPTIONAL,
+    "group_move_up": _OPTIONAL,
+    "group_move_down": _OPTIONAL,
+    "group_stop": _OPTIONAL,
+    # Iveo
+    "iveo_set_repeater": _OPTIONAL,
+    "iveo_get_repeater": _OPTIONAL,
+    "iveo_set_label": _OPTIONAL,
+    "iveo_set_type": _OPTIONAL,
+    "iveo_get_type": _OPTIONAL,
+    "iveo_get_ids": _OPTIONAL,
+    "iveo_factory_reset": _OPTIONAL,
+    "iveo_teach": _OPTIONAL,
+    "iveo_learn": _OPTIONAL,
+    "iveo_command_manual": _OPTIONAL,
+    "iveo_command_automatic": _OPTIONAL,
+    "iveo_command_result": _OPTIONAL,
+    "iveo_set_travel_time": _OPTIONAL,
+    # Sensor
+    "sensor_teach_start": _OPTIONAL,
+    "sensor_teach_stop": _OPTIONAL,
+    "sensor_teach_result": _OPTIONAL,
+    "sensor_get_ids": _OPTIONAL,
+    "sensor_get_info": _OPTIONAL,
+    "sensor_get_values": _OPTIONAL,
+    "sensor_set_label": _OPTIONAL,
+    "sensor_delete": _OPTIONAL,
+    "sensor_write_manual": _OPTIONAL,
+    "sensor_update_values": _OPTIONAL,
+    # Sender
+    "sender_teach_start": _OPTIONAL,
+    "sender_teach_stop": _OPTIONAL,
+    "sender_teach_result": _OPTIONAL,
+    "sender_get_ids": _OPTIONAL,
+    "sender_get_info": _OPTIONAL,
+    "sender_get_values": _OPTIONAL,
+    "sender_set_label": _OPTIONAL,
+    "sender_delete": _OPTIONAL,
+    "sender_write_manual": _OPTIONAL,
+    "sender_update_values": _OPTIONAL,
+    # SenSim
+    "sensim_get_ids": _OPTIONAL,
+    "sensim_get_config": _OPTIONAL,
+    "sensim_set_config": _OPTIONAL,
+    "sensim_get_values": _OPTIONAL,
+    "sensim_set_values": _OPTIONAL,
+    "sensim_set_label": _OPTIONAL,
+    "sensim_drive": _OPTIONAL,
+    "sensim_store": _OPTIONAL,
+    "sensim_delete": _OPTIONAL,
+    "sensim_factory": _OPTIONAL,
+    "sensim_get_test": _OPTIONAL,
+    "sensim_set_test": _OPTIONAL,
+    # Firmware
+    "firmware_get_version": _OPTIONAL,
+    "firmware_update": _OPTIONAL,
+}
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def async_handle_service(call: ServiceCall):
+        gateway = async_get_gateway(hass, call)
+        return await getattr(gateway, call.service)(call)
+
+    for name, supports_response in SERVICES.items():
+        hass.services.async_register(DOMAIN, name, async_handle_service, supports_response=supports_response)
+
+
+@callback
+def async_get_gateway(hass: HomeAssistant, call: ServiceCall) -> SelveGateway:
+    """Return the gateway a service call is meant for.
+
+    The gateway is selected by the `gateway` field, otherwise by the entities
+    or devices the call targets. Without either, the call goes to the only
+    gateway that is set up.
+    """
+    gateways = [gateway for gateway in hass.data.get(DOMAIN, {}).values() if gateway.controller is not None]
+    if not gateways:
+        raise HomeAssistantError("No Selve gateway is set up")
+
+    selected = call.data.get(ATTR_GATEWAY)
+    if selected is not None:
+        selected = str(selected)
+        for gateway in gateways:
+            if selected in (gateway.port, gateway.gatewayId, gateway.config_entry.entry_id):
+                return gateway
+        raise HomeAssistantError(f"No Selve gateway {selected} is set up")
+
+    entry_ids = _target_entry_ids(hass, call)
+    if entry_ids:
+        targeted = [gateway for gateway in gateways if gateway.config_entry.entry_id in entry_ids]
+        if len(targeted) == 1:
+            return targeted[0]
+        if len(targeted) > 1:
+            raise HomeAssistantError("The targets of the call belong to more than one Selve gateway")
+        raise HomeAssistantError("The targets of the call do not belong to a Selve gateway")
+
+    if len(gateways) > 1:
+        raise HomeAssistantError(
+            f"{len(gateways)} Selve gateways are set up, select one with the `{ATTR_GATEWAY}` field"
+        )
+    return gateways[0]
+
+
+def _target_entry_ids(hass: HomeAssistant, call: ServiceCall) -> set[str]:
+    """Return the config entries of the entities and devices a service call targets."""
+    entry_ids = set()
+    # move_many is keyed by entity ids, device registry ids or Selve ids
+    targets = [str(key) for key in call.data.get(ATTR_TARGETS, {})]
+    entity_registry = er.async_get(hass)
+    entity_ids = [
+        *cv.ensure_list(call.data.get(ATTR_ENTITY_ID)),
+        *(key for key in targets if "." in key),
+    ]
+    for entity_id in entity_ids:
+        entity = entity_registry.async_get(entity_id)
+        if entity is not None and entity.platform == DOMAIN and entity.config_entry_id:
+            entry_ids.add(entity.config_entry_id)
+    device_registry = dr.async_get(hass)
+    device_ids = [
+        *cv.ensure_list(call.data.get(ATTR_DEVICE_ID)),
+        *(key for key in targets if "." not in key),
+    ]
+    for device_id in device_ids:
+        device = device_registry.async_get(device_id)
+        if device is not None:
+            entry_ids.update(device.config_entries)
+    return entry_ids
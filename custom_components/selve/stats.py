@@ -0,0 +1,117 @@
+"""
+Latency statistics.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+
+# Upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class LatencyHistogram:
+    """Histogram of latencies with fixed buckets.
+
+    Memory does not grow with the number of samples. With `window`, only the
+    last `window` samples are counted, and `max` is the largest of them.
+    """
+
+    def __init__(self, window: int | None = None) -> None:
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self._max = 0.0
+        self.last = None
+        self._window = deque(maxlen=window) if window else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean latency in seconds."""
+        return self.total / self.count if self.count else None
+
+    @property
+    def max(self) -> float:
+        """Return the largest latency in seconds."""
+        if self._window is not None:
+            return max((seconds for _, seconds in self._window), default=0.0)
+        return self._max
+
+    def record(self, seconds: float) -> None:
+        """Add a latency in seconds."""
+        index = bisect_left(LATENCY_BUCKETS, seconds)
+        if self._window is not None:
+            if len(self._window) == self._window.maxlen:
+                old_index, old_seconds = self._window[0]
+                self.counts[old_index] -= 1
+                self.count -= 1
+                self.total -= old_seconds
+            self._window.append((index, seconds))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if self._window is None:
+            self._max = max(self._max, seconds)
+        self.last = seconds
+
+    def percentile(self, percent: float) -> float | None:
+        """Return the upper bound of the bucket holding the given percentile, in seconds."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                break
+        if index == len(LATENCY_BUCKETS) - 1:
+            return self.max
+        return LATENCY_BUCKETS[index]
+
+    def as_dict(self) -> dict:
+        """Return the statistics in milliseconds."""
+
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 1)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max) if self.count else None,
+            "last_ms": ms(self.last),
+            "buckets": {
+                ("inf" if bound == float("inf") else f"{bound * 1000:g}ms"): count
+                for bound, count in zip(LATENCY_BUCKETS, self.counts)
+            },
+        }
+
+
+class CallStats:
+    """Number of calls, errors and latencies of a single method."""
+
+    __slots__ = ("errors", "latency")
+
+    def __init__(self) -> None:
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def count(self) -> int:
+        """Return the number of calls."""
+        return self.latency.count
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        """Add a call that took `seconds`."""
+        self.latency.record(seconds)
+        if error:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        """Return the statistics in milliseconds."""
+        latency = self.latency.as_dict()
+        del latency["buckets"]
+        return {"errors": self.errors, **latency}
@@ -0,0 +1,146 @@
+"""
+Persistent cache of the devices known to a gateway.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from selve import (
+    SelveTypes,
+    DeviceType,
+    DeviceState,
+    MovementState,
+    DayMode,
+    SelveDevice,
+    IveoDevice,
+    SelveGroup,
+    SelveSensor,
+    SelveSender,
+    SelveSenSim,
+    windDigital,
+    rainDigital,
+    tempDigital,
+    lightDigital,
+)
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60
+
+# Device classes and cached attributes per device type
+CACHED_TYPES = {
+    SelveTypes.DEVICE: (SelveDevice, (
+        "name", "device_sub_type", "rfAdress", "infoState", "state", "value", "targetValue",
+        "unreachable", "overload", "obstructed", "alarm", "lostSensor", "automaticMode",
+        "gatewayNotLearned", "windAlarm", "rainAlarm", "freezingAlarm", "dayMode",
+    )),
+    SelveTypes.IVEO: (IveoDevice, ("name", "device_sub_type", "activity", "state", "value", "targetValue")),
+    SelveTypes.GROUP: (SelveGroup, ("name", "mask")),
+    SelveTypes.SENSOR: (SelveSensor, ("name", "rfAdress")),
+    SelveTypes.SENDER: (SelveSender, ("name", "rfAdress", "channel", "resetCount")),
+    SelveTypes.SENSIM: (SelveSenSim, (
+        "name", "activity", "windDigital", "rainDigital", "tempDigital", "lightDigital",
+        "tempAnalog", "windAnalog", "sun1Analog", "dayLightAnalog", "sun2Analog", "sun3Analog",
+    )),
+}
+
+# Attributes holding enums, which are cached by value
+ENUM_ATTRIBUTES = {
+    "device_sub_type": DeviceType,
+    "infoState": DeviceState,
+    "state": MovementState,
+    "dayMode": DayMode,
+    "windDigital": windDigital,
+    "rainDigital": rainDigital,
+    "tempDigital": tempDigital,
+    "lightDigital": lightDigital,
+}
+
+
+def device_to_cache(device, attributes) -> dict:
+    """Return the cached representation of a device."""
+    data = {"id": device.id}
+    for attribute in attributes:
+        value = getattr(device, attribute, None)
+        data[attribute] = value.value if isinstance(value, Enum) else value
+    return data
+
+
+def device_from_cache(device_type: SelveTypes, data: dict):
+    """Create a device from its cached representation."""
+    device_class, attributes = CACHED_TYPES[device_type]
+    device = device_class(data["id"], device_type=device_type)
+    for attribute in attributes:
+        if attribute not in data:
+            continue
+        value = data[attribute]
+        enum = ENUM_ATTRIBUTES.get(attribute)
+        if enum is not None and value is not None:
+            try:
+                value = enum(value)
+            except ValueError:
+                continue
+        setattr(device, attribute, value)
+    return device
+
+
+class SelveDeviceStore:
+    """Stores the gateway's devices, their last known values and the IVEO travel times in .storage."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._controller = None
+        self._save_scheduled = False
+        # Calibrated travel times in seconds (up, down) per IVEO device id
+        self.travel_times = {}
+
+    async def async_load(self) -> dict | None:
+        """Load the cached devices."""
+        data = await self._store.async_load()
+        if data is not None:
+            self.travel_times = {int(id): tuple(times) for id, times in data.get("travel_times", {}).items()}
+        return data
+
+    @staticmethod
+    def restore(controller, data: dict) -> None:
+        """Add the cached devices to the controller."""
+        for device_type in CACHED_TYPES:
+            devices = controller.devices[device_type.value]
+            devices.clear()
+            for device_data in data.get("devices", {}).get(device_type.value, []):
+                device = device_from_cache(device_type, device_data)
+                devices[device.id] = device
+
+    async def async_save(self, controller) -> None:
+        """Save the controller's devices now."""
+        self._controller = controller
+        await self._store.async_save(self._data_to_save())
+
+    def async_schedule_save(self, controller) -> None:
+        """Save the controller's devices after a delay. Repeated calls are merged."""
+        self._controller = controller
+        if self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Remove the cache."""
+        await self._store.async_remove()
+
+    def _data_to_save(self) -> dict:
+        self._save_scheduled = False
+        devices = {}
+        for device_type, (_, attributes) in CACHED_TYPES.items():
+            devices[device_type.value] = [
+                device_to_cache(device, attributes)
+                for device in self._controller.devices[device_type.value].values()
+            ]
+        return {
+            "devices": devices,
+            "travel_times": {str(id): list(times) for id, times in self.travel_times.items()},
+        }
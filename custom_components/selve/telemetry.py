@@ -0,0 +1,120 @@
+"""
+Adaptive polling of the gateway's own state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+# Base and maximum poll interval in seconds per value. The interval doubles
+# with every poll that finds the value unchanged, up to the maximum.
+POLL_INTERVALS = {
+    "temperature": (60.0, 1800.0),
+    "duty": (60.0, 600.0),
+    "led": (300.0, 3600.0),
+    "forwarding": (300.0, 3600.0),
+}
+# Seconds after start before the first polls, leaving the serial line to the startup refresh
+STARTUP_DELAY = 30.0
+
+
+class TelemetryPoller:
+    """Polls the gateway's temperature, duty cycle, LED and forwarding state.
+
+    Each value is polled on its own schedule, which backs off while the value
+    is stable. A value pushed by the gateway (the duty cycle event) counts as a
+    poll, so pushed values are only polled if the pushes stop. While the
+    gateway is busy sending RF commands, unavailable or close to its duty
+    cycle limit, due polls are postponed by their interval.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        readers: dict[str, Callable[[], Awaitable[Any]]],
+        busy: Callable[[str], bool],
+        updated: Callable[[], None],
+    ) -> None:
+        self._hass = hass
+        self._readers = readers
+        self._busy = busy
+        self._updated = updated
+        self._task = None
+
+        self.values = {}
+        self.intervals = {key: POLL_INTERVALS[key][0] for key in readers}
+        self._next_poll = {key: time.monotonic() + STARTUP_DELAY for key in readers}
+        self.poll_count = 0
+        self.failed_count = 0
+        self.deferred_count = 0
+        self.recorded_count = 0
+
+    def start(self, config_entry: ConfigEntry) -> None:
+        """Start polling."""
+        self._task = config_entry.async_create_background_task(
+            self._hass, self._async_run(), "selve telemetry poller"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop polling."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @callback
+    def record(self, key: str, value: Any) -> None:
+        """Apply a value pushed by the gateway or read by a service, and postpone its next poll."""
+        self.recorded_count += 1
+        if key in self._next_poll:
+            self._next_poll[key] = time.monotonic() + self.intervals[key]
+        self._set_value(key, value)
+
+    async def async_poll(self, key: str) -> bool:
+        """Read a value from the gateway now. Returns True if it could be read."""
+        self.poll_count += 1
+        try:
+            value = await self._readers[key]()
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.debug("Error when reading the %s of the gateway", key, exc_info=True)
+            value = None
+        if value is None:
+            self.failed_count += 1
+            return False
+
+        base, maximum = POLL_INTERVALS[key]
+        if key in self.values and self.values[key] == value:
+            self.intervals[key] = min(self.intervals[key] * 2, maximum)
+        else:
+            self.intervals[key] = base
+        self._set_value(key, value)
+        return True
+
+    def _set_value(self, key: str, value: Any) -> None:
+        if key in self.values and self.values[key] == value:
+            return
+        self.values[key] = value
+        self._updated()
+
+    async def _async_run(self) -> None:
+        while True:
+            key = min(self._next_poll, key=self._next_poll.get)
+            delay = self._next_poll[key] - time.monotonic()
+            if delay > 0:
+                # Pushed values move their next poll, so check again when it is due
+                await asyncio.sleep(delay)
+                continue
+
+            if self._busy(key):
+                self.deferred_count += 1
+                self._next_poll[key] = time.monotonic() + self.intervals[key]
+                continue
+            await self.async_poll(key)
+            self._next_poll[key] = time.monotonic() + self.intervals[key]